@@ -0,0 +1,80 @@
+import pandas as pd
+import threading
+import logging
+from typing import Dict, List, Tuple
+
+# Reutiliza o logger definido em main.py
+logger = logging.getLogger("api_logger")
+
+# Maior top-N por preço pré-calculado (resumo do dashboard)
+MAX_TOP_N = 50
+
+
+class BookStats:
+    """
+    Agregados da coleção de livros, calculados uma única vez por versão do dataset.
+    """
+
+    def __init__(self, df: pd.DataFrame, version: int):
+        self.version = version
+
+        if df.empty:
+            self.overview = {"total_books": 0, "average_price": 0.0, "rating_distribution": {}}
+            self.categories: List[Dict] = []
+            self.category_names: List[str] = []
+            self.rating_counts: Dict[int, int] = {}
+            self.category_counts: Dict[str, int] = {}
+            self.top_by_price: List[Dict] = []
+            return
+
+        self.overview = {
+            "total_books": len(df),
+            "average_price": float(df["price"].mean()),
+            "rating_distribution": df["rating"].value_counts().to_dict(),
+        }
+
+        stats = df.groupby("category").agg({"title": "count", "price": ["mean", "min", "max"]}).reset_index()
+        stats.columns = ["category", "total_books", "avg_price", "min_price", "max_price"]
+        self.categories = stats.to_dict("records")
+
+        self.category_names = df["category"].unique().tolist()
+
+        # Resumo compacto para o dashboard: contagens em vez das linhas do dataset
+        self.rating_counts = {int(rating): int(count) for rating, count in df["rating"].value_counts().sort_index().items()}
+        self.category_counts = {str(category): int(count) for category, count in df["category"].value_counts().items()}
+        self.top_by_price = df.nlargest(MAX_TOP_N, "price")[["id", "title", "price", "category"]].to_dict("records")
+
+    def dashboard(self, top: int) -> Dict:
+        """
+        Retorna o resumo usado pelo dashboard: totais, contagens por rating e por categoria e os top livros por preço.
+        """
+        return {
+            "total_books": self.overview["total_books"],
+            "average_price": self.overview["average_price"],
+            "rating_counts": self.rating_counts,
+            "category_counts": self.category_counts,
+            "top_by_price": self.top_by_price[:top],
+        }
+
+
+# Cache dos agregados: guarda apenas a versão mais recente do dataset
+_stats_cache: Tuple[int, BookStats] = (-1, None)
+_stats_lock = threading.Lock()
+
+
+def get_stats(df: pd.DataFrame, version: int) -> BookStats:
+    """
+    Retorna os agregados da versão informada, calculando-os apenas na primeira chamada após cada recarga.
+    """
+    global _stats_cache
+    cached_version, stats = _stats_cache
+    if cached_version == version:
+        return stats
+
+    with _stats_lock:
+        cached_version, stats = _stats_cache
+        if cached_version != version:
+            stats = BookStats(df, version)
+            _stats_cache = (version, stats)
+            logger.info(f"Agregados calculados para a versão {version} do dataset")
+    return stats
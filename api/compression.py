@@ -0,0 +1,100 @@
+from fastapi.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipResponder, IdentityResponder
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import os
+
+try:
+    import brotli
+except ImportError:  # Sem o pacote brotli, apenas gzip é negociado
+    brotli = None
+
+# Formatos que já chegam comprimidos (npz com deflate, Arrow IPC com zstd): recomprimir só gastaria CPU
+PRECOMPRESSED_MEDIA_TYPES = ("application/x-npz", "application/vnd.apache.arrow.stream")
+
+# Blocos de corpo a partir deste tamanho são comprimidos em uma thread, sem bloquear o event loop
+THREAD_COMPRESSION_MIN_SIZE = int(os.getenv("THREAD_COMPRESSION_MIN_SIZE", str(256 * 1024)))
+
+
+class CompressionResponderMixin:
+    """
+    Ajustes sobre os responders do Starlette: envia sem compressão as respostas cujo Content-Type está em
+    PRECOMPRESSED_MEDIA_TYPES e comprime os blocos grandes em uma thread. O resultado é entregue ao fluxo
+    original do Starlette, que continua responsável pelos headers e pela ordem dos blocos.
+    """
+
+    async def send_with_compression(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            await super().send_with_compression(message)
+            content_type = Headers(raw=message["headers"]).get("content-type", "")
+            self.content_type_is_excluded = self.content_type_is_excluded or content_type.startswith(PRECOMPRESSED_MEDIA_TYPES)
+            return
+
+        body = message.get("body", b"")
+        if self.content_encoding_set or self.content_type_is_excluded or len(body) < max(THREAD_COMPRESSION_MIN_SIZE, self.minimum_size):
+            await super().send_with_compression(message)
+            return
+
+        compressed = await run_in_threadpool(self.apply_compression, body, more_body=message.get("more_body", False))
+        self.apply_compression = lambda *args, **kwargs: compressed
+        try:
+            await super().send_with_compression(message)
+        finally:
+            del self.apply_compression
+
+
+class GZipCompressionResponder(CompressionResponderMixin, GZipResponder):
+    pass
+
+
+class BrotliResponder(CompressionResponderMixin, IdentityResponder):
+    """
+    Compressão brotli sobre o mesmo fluxo de envio do GZipResponder do Starlette (inclusive respostas em streaming).
+    """
+
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int = 4):
+        super().__init__(app, minimum_size)
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        compressed = self.compressor.process(body)
+        return compressed + (self.compressor.flush() if more_body else self.compressor.finish())
+
+
+def _accepted_encodings(accept_encoding: str) -> set:
+    encodings = set()
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0"):
+            continue
+        encodings.add(name.strip().lower())
+    return encodings
+
+
+class CompressionMiddleware:
+    """
+    Negocia a compressão da resposta pelo header Accept-Encoding: brotli (se disponível), gzip ou nenhuma.
+    Respostas menores que minimum_size não são comprimidas.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 4, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encodings = _accepted_encodings(Headers(scope=scope).get("Accept-Encoding", ""))
+        if brotli is not None and "br" in encodings:
+            responder = BrotliResponder(self.app, self.minimum_size, self.brotli_quality)
+        elif "gzip" in encodings:
+            responder = GZipCompressionResponder(self.app, self.minimum_size, compresslevel=self.gzip_level)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+        await responder(scope, receive, send)
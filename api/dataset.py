@@ -0,0 +1,175 @@
+import pandas as pd
+import csv
+import hashlib
+import logging
+import os
+import tempfile
+from typing import Dict, List, Optional, Tuple
+from api.indexes import BookIndex
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+except ImportError:  # Sem pyarrow, o dataset é lido apenas do CSV
+    pa = None
+
+# Reutiliza o logger definido em main.py
+logger = logging.getLogger("api_logger")
+
+# Colunas e tipos do dataset de livros
+FIELDNAMES = ["id", "title", "href", "price", "rating", "availability", "category", "image_url"]
+DTYPES = {"id": int, "title": str, "href": str, "price": float, "rating": int, "availability": str, "category": str, "image_url": str}
+
+if pa is not None:
+    ARROW_SCHEMA = pa.schema(
+        [
+            ("id", pa.int64()),
+            ("title", pa.string()),
+            ("href", pa.string()),
+            ("price", pa.float64()),
+            ("rating", pa.int64()),
+            ("availability", pa.string()),
+            ("category", pa.string()),
+            ("image_url", pa.string()),
+        ]
+    )
+
+
+class DatasetSnapshot:
+    """
+    Versão imutável do dataset carregado em memória: DataFrame, índices e identificação da origem.
+    As rotas recebem sempre o mesmo snapshot durante uma requisição; uma recarga cria um novo
+    snapshot e troca a referência global, sem alterar o anterior. O DataFrame não deve ser modificado.
+    """
+
+    def __init__(self, df: pd.DataFrame, version: int, source_mtime: Optional[Tuple] = None):
+        self.df = df
+        self.version = version
+        self.source_mtime = source_mtime
+        self.index = BookIndex(df)
+
+        # Identifica o conteúdo de forma estável entre workers (mesmos arquivos -> mesmo fingerprint),
+        # ao contrário de version, que é um contador do processo
+        origin = source_mtime if source_mtime and any(source_mtime) else ("version", version)
+        self.fingerprint = hashlib.sha1(repr((origin, len(df))).encode()).hexdigest()[:16]
+
+
+def file_mtime(path: str) -> Optional[float]:
+    """
+    Retorna o instante de modificação do arquivo, ou None se ele não existir.
+    """
+    try:
+        return os.stat(path).st_mtime_ns / 1e9
+    except OSError:
+        return None
+
+
+def snapshot_path(csv_path: str) -> str:
+    """
+    Retorna o caminho do snapshot colunar (Arrow IPC) correspondente ao CSV.
+    """
+    return os.path.splitext(csv_path)[0] + ".arrow"
+
+
+def dataset_mtime(csv_path: str) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Identifica a versão em disco do dataset pelos instantes de modificação do CSV e do snapshot colunar.
+    """
+    return file_mtime(csv_path), file_mtime(snapshot_path(csv_path))
+
+
+def read_books_csv(path: str) -> pd.DataFrame:
+    """
+    Lê o CSV de livros com os tipos esperados.
+    """
+    return pd.read_csv(path, dtype=DTYPES)
+
+
+def read_books_arrow(path: str) -> pd.DataFrame:
+    """
+    Abre o snapshot Arrow IPC via memory-map, evitando o parsing do CSV: as colunas numéricas viram arrays
+    somente leitura sobre o arquivo. As de texto são convertidas para objetos str, como na leitura do CSV,
+    porque os registros e os índices de texto de BookIndex precisam deles de qualquer forma e são construídos
+    mais rápido a partir de colunas object do que de string[pyarrow].
+    """
+    table = ipc.open_file(pa.memory_map(path, "r")).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def read_books(csv_path: str) -> Tuple[pd.DataFrame, Tuple[Optional[float], Optional[float]]]:
+    """
+    Carrega o dataset preferindo o snapshot colunar; se ele não existir ou estiver mais antigo que o CSV,
+    lê o CSV e gera o snapshot para as próximas cargas.
+    Retorna o DataFrame e os instantes de modificação (CSV, snapshot) correspondentes ao que foi carregado,
+    já considerando o snapshot gerado aqui, para que a verificação de alteração não o tome por uma mudança externa.
+    """
+    csv_mtime, arrow_mtime = dataset_mtime(csv_path)
+    if pa is None:
+        return read_books_csv(csv_path), (csv_mtime, arrow_mtime)
+
+    arrow_path = snapshot_path(csv_path)
+    if arrow_mtime is not None and (csv_mtime is None or arrow_mtime >= csv_mtime):
+        return read_books_arrow(arrow_path), (csv_mtime, arrow_mtime)
+
+    df = read_books_csv(csv_path)
+    try:
+        write_books_arrow(df, arrow_path)
+        logger.info(f"Snapshot colunar gerado a partir do CSV: {arrow_path}")
+    except Exception as e:
+        logger.error(f"Erro ao gerar snapshot colunar: {str(e)}", exc_info=True)
+    return df, (csv_mtime, file_mtime(arrow_path))
+
+
+def _atomic_path(path: str, suffix: str) -> Tuple[int, str]:
+    directory = os.path.dirname(os.path.abspath(path))
+    return tempfile.mkstemp(prefix=".books-", suffix=suffix, dir=directory)
+
+
+def write_books_arrow(df: pd.DataFrame, path: str):
+    """
+    Grava o snapshot colunar em Arrow IPC (sem compressão, para permitir memory-map) de forma atômica.
+    """
+    table = pa.Table.from_pandas(df[FIELDNAMES], schema=ARROW_SCHEMA, preserve_index=False)
+    fd, tmp_path = _atomic_path(path, ".arrow.tmp")
+    try:
+        with os.fdopen(fd, "wb") as sink:
+            with ipc.new_file(sink, ARROW_SCHEMA) as writer:
+                writer.write_table(table)
+            sink.flush()
+            os.fsync(sink.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_books_csv(books: List[Dict], path: str):
+    """
+    Grava o CSV de livros de forma atômica: escreve em um arquivo temporário no mesmo diretório
+    e o substitui com os.replace. Leitores enxergam sempre o arquivo antigo ou o novo, nunca um arquivo parcial.
+    """
+    fd, tmp_path = _atomic_path(path, ".csv.tmp")
+    try:
+        with os.fdopen(fd, "w", newline="", encoding="utf-8") as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=FIELDNAMES)
+            writer.writeheader()
+            writer.writerows(books)
+            csvfile.flush()
+            os.fsync(csvfile.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_books_snapshot(books: List[Dict], csv_path: str):
+    """
+    Grava o resultado do scraping: o CSV (formato de exportação) e, se o pyarrow estiver disponível,
+    o snapshot colunar usado pelas cargas. O snapshot é gravado depois do CSV para não ficar mais antigo que ele.
+    """
+    write_books_csv(books, csv_path)
+    if pa is not None:
+        df = pd.DataFrame(books, columns=FIELDNAMES).astype(DTYPES)
+        write_books_arrow(df, snapshot_path(csv_path))
@@ -1,5 +1,6 @@
 import pandas as pd
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
 from fastapi.security import OAuth2PasswordBearer
@@ -7,7 +8,17 @@ from typing import Dict, List
 import logging
 import uuid
 from api.models import TokenData
+from api.indexes import BookIndex
+from api.aggregates import BookStats, get_stats
+from api.features import FeatureMatrix, get_features
+from api.predictor import schedule_training
+from api.dataset import DatasetSnapshot, dataset_mtime, read_books
+from api.revocation import create_revocation_store
+from api.token_cache import VerifiedTokenCache
+from api.metrics import DATASET_RELOAD_DURATION, DATASET_ROWS, DATASET_VERSION, registry
 import os
+import threading
+import time
 
 # Reutiliza o logger definido em main.py
 logger = logging.getLogger("api_logger")
@@ -23,8 +34,13 @@ DATA_FILE = os.getenv("DATA_FILE", "data/books.csv")  # Fallback para data/book.
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
 
-# Lista em memória para armazenar tokens revogados
-revoked_tokens = set()
+# Armazenamento de tokens revogados, compartilhado entre workers e com expiração junto com o token
+revocation_store = create_revocation_store()
+
+# Tokens já verificados, para não repetir a decodificação JWT a cada requisição
+token_cache = VerifiedTokenCache()
+registry.callback("token_cache_hits_total", "Requisições autenticadas atendidas pelo cache de tokens", lambda: token_cache.hits, type="counter")
+registry.callback("token_cache_misses_total", "Requisições autenticadas que precisaram decodificar o JWT", lambda: token_cache.misses, type="counter")
 
 # Usuários fictícios para autenticação
 try:
@@ -34,47 +50,143 @@ except Exception as e:
     logger.error(f"Erro ao inicializar fake_users_db: {str(e)}", exc_info=True)
     raise
 
-# Variável global para armazenar o DataFrame
-books_df = None
+# Snapshot atual do dataset (DataFrame + índices); substituído por inteiro a cada carga
+books_snapshot: DatasetSnapshot = None
 
+# Garante uma única recarga por vez (single-flight)
+_reload_lock = threading.Lock()
 
-def load_books_data() -> pd.DataFrame:
+# Intervalo mínimo, em segundos, entre verificações de alteração do arquivo de dados
+RELOAD_CHECK_INTERVAL = 1.0
+_last_reload_check = 0.0
+
+
+def _load_snapshot() -> pd.DataFrame:
     """
-    Carrega os dados do CSV e retorna o DataFrame.
-    Método chamado na inicialização da aplicação e também ao finalizar o scrape.
+    Lê o dataset (snapshot colunar ou CSV) e publica um novo snapshot. Deve ser chamado com _reload_lock adquirido.
     """
-    global books_df
+    global books_snapshot
+    start = time.perf_counter()
+    result = "success"
     try:
-        books_df = pd.read_csv(
-            DATA_FILE,
-            dtype={"id": int, "title": str, "href": str, "price": float, "rating": int, "availability": str, "category": str, "image_url": str},
-        )
-        logger.info("Dados do CSV carregados com sucesso")
+        df, source_mtime = read_books(DATA_FILE)
+        logger.info("Dados dos livros carregados com sucesso")
     except Exception as e:
         logger.error(f"Erro ao carregar books.csv: {str(e)}", exc_info=True)
-        books_df = pd.DataFrame()
-    return books_df
+        df = pd.DataFrame()
+        source_mtime = dataset_mtime(DATA_FILE)
+        result = "error"
+    version = books_snapshot.version + 1 if books_snapshot else 1
+    books_snapshot = DatasetSnapshot(df, version, source_mtime)
+    # O modelo de predição é treinado em segundo plano sobre a nova versão
+    schedule_training(df, version)
+
+    DATASET_RELOAD_DURATION.observe(time.perf_counter() - start, result=result)
+    DATASET_ROWS.set(len(df))
+    DATASET_VERSION.set(version)
+    return df
+
+
+def load_books_data() -> pd.DataFrame:
+    """
+    Carrega os dados dos livros, publica um novo snapshot e retorna o DataFrame.
+    Método chamado na inicialização da aplicação e também ao finalizar o scrape.
+    Chamadas concorrentes são serializadas; o snapshot anterior continua válido para quem já o possui.
+    """
+    with _reload_lock:
+        return _load_snapshot()
+
+
+def _reload_if_changed():
+    """
+    Recarrega os dados apenas se o arquivo foi alterado desde a última carga (por exemplo, por outro worker).
+    A verificação é limitada a uma por RELOAD_CHECK_INTERVAL e, havendo recarga em andamento,
+    as demais requisições aguardam o resultado em vez de repetir a leitura do CSV.
+    """
+    global _last_reload_check
+    now = time.monotonic()
+    if now - _last_reload_check < RELOAD_CHECK_INTERVAL:
+        return
+    _last_reload_check = now
+
+    if dataset_mtime(DATA_FILE) == books_snapshot.source_mtime:
+        return
+    with _reload_lock:
+        # Outra requisição pode ter concluído a recarga enquanto esta aguardava
+        if dataset_mtime(DATA_FILE) != books_snapshot.source_mtime:
+            logger.info("Arquivo de dados alterado, recarregando")
+            _load_snapshot()
 
 
 # Carrega o CSV na inicialização da aplicação
-books_df = load_books_data()
+load_books_data()
 
 
-def get_books_data() -> pd.DataFrame:
+def get_dataset(request: Request = None) -> DatasetSnapshot:
     """
-    Retorna o DataFrame com os dados dos livros.
+    Retorna o snapshot atual do dataset. As demais dependências derivam dele,
+    garantindo que uma requisição use DataFrame e índices da mesma versão.
+    Se a rota já resolveu o snapshot da requisição (request.state.dataset, ver CachedRoute), ele é reaproveitado.
     """
-    if books_df is None or books_df.empty:
+    dataset = getattr(request.state, "dataset", None) if request is not None else None
+    if dataset is not None:
+        return dataset
+    _reload_if_changed()
+    if books_snapshot.df.empty:
         logger.warning("DataFrame de livros está vazio ou não carregado")
-        return load_books_data()
-    return books_df
+    return books_snapshot
+
+
+def get_books_data(dataset: DatasetSnapshot = Depends(get_dataset)) -> pd.DataFrame:
+    """
+    Retorna o DataFrame com os dados dos livros.
+    """
+    return dataset.df
+
+
+def get_books_index(dataset: DatasetSnapshot = Depends(get_dataset)) -> BookIndex:
+    """
+    Retorna os índices construídos sobre o DataFrame de livros.
+    """
+    return dataset.index
+
+
+def get_books_stats(dataset: DatasetSnapshot = Depends(get_dataset)) -> BookStats:
+    """
+    Retorna os agregados da versão atual do dataset, calculados uma única vez por carga.
+    """
+    return get_stats(dataset.df, dataset.version)
+
+
+def get_books_features(dataset: DatasetSnapshot = Depends(get_dataset)) -> FeatureMatrix:
+    """
+    Retorna a matriz de features de ML da versão atual do dataset, montada uma única vez por carga.
+    """
+    return get_features(dataset.df, dataset.version)
 
 
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> Dict:
     """
     Valida o token JWT e retorna os dados do usuário.
     Verifica se o token está revogado.
+    Tokens já verificados são atendidos pelo cache, restando apenas a verificação de revogação.
+    A consulta de revogação pode ir ao SQLite e roda no pool de threads, fora do event loop.
     """
+    revoked_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Token revogado",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    cached = token_cache.get(token)
+    if cached is not None:
+        user, jti = cached
+        if await run_in_threadpool(revocation_store.is_revoked, jti):
+            token_cache.invalidate(jti)
+            logger.error(f"Token revogado usado: jti={jti}")
+            raise revoked_exception
+        logger.debug("Usuário %s autenticado pelo cache de tokens", user['username'])
+        return user
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Não foi possível validar as credenciais",
@@ -84,16 +196,13 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> Dict:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
         jti: str = payload.get("jti")
-        if username is None or jti is None:
-            logger.error("Token JWT sem 'sub' ou 'jti'")
+        expires_at = payload.get("exp")
+        if username is None or jti is None or expires_at is None:
+            logger.error("Token JWT sem 'sub', 'jti' ou 'exp'")
             raise credentials_exception
-        if jti in revoked_tokens:
+        if await run_in_threadpool(revocation_store.is_revoked, jti):
             logger.error(f"Token revogado usado: jti={jti}")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token revogado",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+            raise revoked_exception
         token_data = TokenData(username=username, jti=jti)
     except JWTError as e:
         logger.error(f"Erro ao decodificar token JWT: {str(e)}")
@@ -103,6 +212,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> Dict:
     if user is None:
         logger.error(f"Usuário {token_data.username} não encontrado")
         raise credentials_exception
+    token_cache.put(token, user, jti, expires_at)
     logger.info(f"Usuário {token_data.username} autenticado com sucesso")
     return user
 
@@ -137,12 +247,15 @@ def verify_password(plain_password: str, stored_password: str) -> bool:
         return False
 
 
-def revoke_token(jti: str):
+def revoke_token(jti: str, expires_at: float = None):
     """
-    Adiciona um token à lista de tokens revogados.
+    Registra um token como revogado até o instante de expiração (exp) do próprio token.
     """
     try:
-        revoked_tokens.add(jti)
+        if expires_at is None:
+            expires_at = time.time() + ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        revocation_store.revoke(jti, float(expires_at))
+        token_cache.invalidate(jti)
         logger.info(f"Token revogado: jti={jti}")
     except Exception as e:
         logger.error(f"Erro ao revogar token: {str(e)}", exc_info=True)
@@ -0,0 +1,181 @@
+import numpy as np
+import pandas as pd
+import io
+import threading
+import logging
+import orjson
+from typing import Dict, Iterator, List, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+except ImportError:  # Sem pyarrow, o formato arrow fica indisponível
+    pa = None
+
+# Reutiliza o logger definido em main.py
+logger = logging.getLogger("api_logger")
+
+# Colunas numéricas da matriz, antes das colunas one-hot de categoria
+NUMERIC_COLUMNS = ["price", "rating"]
+
+# Linhas serializadas por bloco nas respostas em streaming
+FEATURES_CHUNK_SIZE = 1000
+
+# Código do pd.factorize para categoria ausente: nenhuma coluna one-hot ativa
+MISSING_CODE = -1
+
+
+class FeatureMatrix:
+    """
+    Matriz de features de ML (preço, rating e one-hot da categoria), montada uma única vez por versão do dataset.
+
+    Cada linha tem no máximo três valores não nulos, então a matriz é guardada de forma esparsa: preço, rating
+    e o código da categoria (posição na lista ordenada de categorias, ou MISSING_CODE para livros sem categoria,
+    que ficam sem nenhuma coluna one-hot ativa, como no pd.get_dummies). A ordem das colunas é estável:
+    NUMERIC_COLUMNS seguidas de category_<nome> em ordem alfabética, a mesma do pd.get_dummies.
+    As serializações binárias são geradas na primeira requisição de cada formato e reaproveitadas.
+    """
+
+    def __init__(self, df: pd.DataFrame, version: int):
+        self.version = version
+        if df.empty:
+            self.ids = np.empty(0, dtype=np.int64)
+            self.price = np.empty(0, dtype=np.float64)
+            self.rating = np.empty(0, dtype=np.int64)
+            self.codes = np.empty(0, dtype=np.int32)
+            self.categories: List[str] = []
+        else:
+            codes, categories = pd.factorize(df["category"], sort=True)
+            self.ids = df["id"].to_numpy(dtype=np.int64)
+            self.price = df["price"].to_numpy(dtype=np.float64)
+            self.rating = df["rating"].to_numpy(dtype=np.int64)
+            self.codes = codes.astype(np.int32)
+            self.categories = categories.tolist()
+        self.columns = NUMERIC_COLUMNS + [f"category_{name}" for name in self.categories]
+        self._encoded: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self.ids), len(self.columns)
+
+    def _cached(self, name: str, encode) -> bytes:
+        body = self._encoded.get(name)
+        if body is None:
+            with self._lock:
+                body = self._encoded.get(name)
+                if body is None:
+                    body = encode()
+                    self._encoded[name] = body
+                    logger.info(f"Features em {name} geradas para a versão {self.version} do dataset ({len(body)} bytes)")
+        return body
+
+    def to_npz(self) -> bytes:
+        """
+        Serializa a matriz no layout CSR do scipy.sparse.save_npz (format, shape, data, indices, indptr),
+        legível com scipy.sparse.load_npz, mais as chaves columns e ids.
+        """
+        return self._cached("npz", self._encode_npz)
+
+    def _encode_npz(self) -> bytes:
+        rows = len(self.ids)
+        width = len(NUMERIC_COLUMNS) + 1
+        data = np.empty((rows, width), dtype=np.float64)
+        data[:, 0] = self.price
+        data[:, 1] = self.rating
+        data[:, 2] = 1.0
+        indices = np.empty((rows, width), dtype=np.int32)
+        indices[:, 0] = 0
+        indices[:, 1] = 1
+        indices[:, 2] = len(NUMERIC_COLUMNS) + self.codes
+        # Livros sem categoria não têm a entrada one-hot: a linha fica só com preço e rating
+        present = np.ones((rows, width), dtype=bool)
+        present[:, 2] = self.codes != MISSING_CODE
+        indptr = np.zeros(rows + 1, dtype=np.int32)
+        np.cumsum(present.sum(axis=1), out=indptr[1:])
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            format=np.array(b"csr"),
+            shape=np.array(self.shape, dtype=np.int64),
+            data=data[present],
+            indices=indices[present],
+            indptr=indptr,
+            columns=np.array(self.columns, dtype=np.str_),
+            ids=self.ids,
+        )
+        return buffer.getvalue()
+
+    def to_arrow(self) -> bytes:
+        """
+        Serializa as features em Arrow IPC (stream, buffers comprimidos com zstd): id, price, rating e category
+        como dicionário cujos índices são os códigos da categoria. A ordem das colunas one-hot fica nos
+        metadados do schema (feature_columns).
+        """
+        if pa is None:
+            raise RuntimeError("pyarrow não está instalado")
+        return self._cached("arrow", self._encode_arrow)
+
+    def _encode_arrow(self) -> bytes:
+        codes = pa.array(self.codes, type=pa.int32(), mask=self.codes == MISSING_CODE)
+        category = pa.DictionaryArray.from_arrays(codes, pa.array(self.categories, type=pa.string()))
+        table = pa.table({"id": self.ids, "price": self.price, "rating": self.rating, "category": category})
+        table = table.replace_schema_metadata({"feature_columns": orjson.dumps(self.columns), "dataset_version": str(self.version)})
+        sink = pa.BufferOutputStream()
+        with ipc.new_stream(sink, table.schema, options=ipc.IpcWriteOptions(compression="zstd")) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    def iter_ndjson(self, chunk_size: int = FEATURES_CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Uma linha por livro, apenas com os valores não nulos: id, price, rating e o nome da coluna one-hot ativa
+        (null para livros sem categoria).
+        """
+        columns = self.columns[len(NUMERIC_COLUMNS) :] + [None]
+        for start in range(0, len(self.ids), chunk_size):
+            end = start + chunk_size
+            rows = zip(self.ids[start:end].tolist(), self.price[start:end].tolist(), self.rating[start:end].tolist(), self.codes[start:end].tolist())
+            yield b"".join(orjson.dumps({"id": id_, "price": price, "rating": rating, "category": columns[code]}) + b"\n" for id_, price, rating, code in rows)
+
+    def iter_json(self, chunk_size: int = FEATURES_CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Lista JSON densa (um objeto por livro com todas as colunas), no formato original do endpoint.
+        Gerada em blocos a partir da matriz esparsa, sem materializar a resposta inteira.
+        """
+        dummies = self.columns[len(NUMERIC_COLUMNS) :]
+        template = dict.fromkeys(dummies, False)
+        yield b"["
+        for start in range(0, len(self.ids), chunk_size):
+            end = start + chunk_size
+            records = []
+            for price, rating, code in zip(self.price[start:end].tolist(), self.rating[start:end].tolist(), self.codes[start:end].tolist()):
+                record = {"price": price, "rating": rating, **template}
+                if code != MISSING_CODE:
+                    record[dummies[code]] = True
+                records.append(record)
+            body = orjson.dumps(records)[1:-1]
+            yield body if start == 0 else b"," + body
+        yield b"]"
+
+
+# Cache da matriz: guarda apenas a versão mais recente do dataset
+_features_cache: Tuple[int, FeatureMatrix] = (-1, None)
+_features_lock = threading.Lock()
+
+
+def get_features(df: pd.DataFrame, version: int) -> FeatureMatrix:
+    """
+    Retorna a matriz de features da versão informada, montando-a apenas na primeira chamada após cada recarga.
+    """
+    global _features_cache
+    cached_version, features = _features_cache
+    if cached_version == version:
+        return features
+
+    with _features_lock:
+        cached_version, features = _features_cache
+        if cached_version != version:
+            features = FeatureMatrix(df, version)
+            _features_cache = (version, features)
+            logger.info(f"Matriz de features montada para a versão {version} do dataset: {features.shape[0]}x{features.shape[1]}")
+    return features
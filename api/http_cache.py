@@ -0,0 +1,117 @@
+from collections import OrderedDict
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.dependencies.utils import get_flat_dependant
+from fastapi.routing import APIRoute
+from typing import Callable, Dict, Optional, Tuple
+from api.dependencies import get_dataset
+import hashlib
+import os
+import threading
+
+# Header Cache-Control das rotas de leitura; por padrão o cliente sempre revalida (If-None-Match)
+CACHE_CONTROL = os.getenv("HTTP_CACHE_CONTROL", "public, max-age=0, must-revalidate")
+
+# Limites do cache de respostas serializadas: entradas, bytes somados dos corpos e tamanho máximo de um corpo
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+RESPONSE_CACHE_MAX_BODY = int(os.getenv("RESPONSE_CACHE_MAX_BODY", str(8 * 1024 * 1024)))
+
+
+class ResponseCache:
+    """
+    Cache LRU de respostas já serializadas, indexado por (fingerprint do dataset, rota, parâmetros).
+    Limitado pela quantidade de entradas e pelo total de bytes dos corpos guardados.
+    Entradas de versões antigas do dataset deixam de ser acessadas e saem pelo LRU.
+    """
+
+    def __init__(self, max_size: int = RESPONSE_CACHE_SIZE, max_bytes: int = RESPONSE_CACHE_MAX_BYTES):
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries: "OrderedDict[Tuple, Tuple[bytes, Dict[str, str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Optional[Tuple[bytes, Dict[str, str]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Tuple, body: bytes, headers: Dict[str, str]):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.total_bytes -= len(previous[0])
+            self._entries[key] = (body, headers)
+            self.total_bytes += len(body)
+            while len(self._entries) > self.max_size or self.total_bytes > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self.total_bytes -= len(evicted)
+
+
+response_cache = ResponseCache()
+
+
+def no_http_cache(endpoint: Callable) -> Callable:
+    """
+    Marca um endpoint GET para não receber ETag nem cache de resposta (ex.: /health).
+    """
+    endpoint.__no_http_cache__ = True
+    return endpoint
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+class CachedRoute(APIRoute):
+    """
+    Rota GET com cache HTTP: gera um ETag a partir do fingerprint do dataset e dos parâmetros declarados pela rota
+    (parâmetros desconhecidos são ignorados e não criam entradas novas), responde 304 Not Modified a requisições
+    condicionais sem executar o endpoint e reaproveita respostas já serializadas do ResponseCache.
+    O snapshot usado na chave é o mesmo entregue ao endpoint (request.state.dataset), então uma recarga
+    no meio da requisição não grava o corpo de uma versão sob o fingerprint de outra.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        if "GET" not in self.methods or getattr(self.endpoint, "__no_http_cache__", False):
+            return handler
+        declared = frozenset(field.alias for field in get_flat_dependant(self.dependant).query_params)
+
+        async def cached_handler(request: Request) -> Response:
+            dataset = await run_in_threadpool(get_dataset)
+            request.state.dataset = dataset
+            params = tuple(sorted(item for item in request.query_params.multi_items() if item[0] in declared))
+            key = (dataset.fingerprint, request.url.path, params)
+            etag = '"' + hashlib.sha1(repr(key).encode()).hexdigest()[:24] + '"'
+            cache_headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+            if etag_matches(request.headers.get("if-none-match"), etag):
+                return Response(status_code=304, headers=cache_headers)
+
+            cached = response_cache.get(key)
+            if cached is not None:
+                body, headers = cached
+                return Response(content=body, status_code=200, headers={**headers, **cache_headers})
+
+            response = await handler(request)
+            if response.status_code != 200:
+                return response
+
+            response.headers.update(cache_headers)
+            # Respostas em streaming recebem ETag, mas não são guardadas (o corpo não está materializado)
+            body = getattr(response, "body", None)
+            if body is not None and len(body) <= RESPONSE_CACHE_MAX_BODY:
+                headers = {name: value for name, value in response.headers.items() if name not in ("content-length", "etag", "cache-control")}
+                response_cache.put(key, body, headers)
+            return response
+
+        return cached_handler
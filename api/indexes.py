@@ -0,0 +1,328 @@
+import bisect
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class TextIndex:
+    """
+    Índice invertido de trigramas sobre uma coluna de texto, para buscas case-insensitive
+    por substring ou prefixo sem varrer a coluna inteira.
+    Os valores são deduplicados: o índice aponta para valores distintos e cada valor
+    aponta para as linhas (posições iloc) onde aparece.
+    """
+
+    NGRAM = 3
+
+    def __init__(self, values: pd.Series):
+        codes, uniques = pd.factorize(values.fillna("").astype(str).str.lower())
+        self.codes = codes
+        self.values: List[str] = list(uniques)
+
+        # Linhas de cada valor distinto: rows_order[bounds[c]:bounds[c + 1]]
+        self.rows_order = np.argsort(codes, kind="stable")
+        self.bounds = np.searchsorted(codes[self.rows_order], np.arange(len(self.values) + 1))
+
+        # Listas invertidas trigrama -> códigos dos valores que o contêm
+        postings: Dict[str, List[int]] = {}
+        for code, value in enumerate(self.values):
+            for gram in {value[i : i + self.NGRAM] for i in range(len(value) - self.NGRAM + 1)}:
+                postings.setdefault(gram, []).append(code)
+        self.postings = {gram: np.array(value_codes, dtype=np.int64) for gram, value_codes in postings.items()}
+
+        # Termos de 1 ou 2 caracteres: cada ocorrência começa um trigrama do valor ou está nos 2 últimos caracteres.
+        # short_grams liga o termo aos trigramas que começam com ele; tail_postings indexa as substrings do final de
+        # cada valor (cobrindo também valores com menos de 3 caracteres)
+        short_grams: Dict[str, List[str]] = {}
+        for gram in self.postings:
+            for size in range(1, self.NGRAM):
+                short_grams.setdefault(gram[:size], []).append(gram)
+        self.short_grams = short_grams
+        tails: Dict[str, List[int]] = {}
+        for code, value in enumerate(self.values):
+            tail = value[-(self.NGRAM - 1) :]
+            for piece in {tail, tail[:1], tail[1:]}:
+                if piece:
+                    tails.setdefault(piece, []).append(code)
+        self.tail_postings = {piece: np.array(value_codes, dtype=np.int64) for piece, value_codes in tails.items()}
+
+        # Valores ordenados para busca de prefixo por bisseção
+        self.sorted_codes = sorted(range(len(self.values)), key=self.values.__getitem__)
+        self.sorted_values = [self.values[code] for code in self.sorted_codes]
+
+    def _match_contains(self, term: str) -> List[int]:
+        if not term:
+            return list(range(len(self.values)))
+        if len(term) < self.NGRAM:
+            # Termos curtos não formam trigramas: união das listas dos trigramas que começam com o termo
+            # e dos valores que o têm no final; o resultado já é exato, sem verificar substrings
+            lists = [self.postings[gram] for gram in self.short_grams.get(term, ())]
+            tail = self.tail_postings.get(term)
+            if tail is not None:
+                lists.append(tail)
+            matched = np.zeros(len(self.values), dtype=bool)
+            for value_codes in lists:
+                matched[value_codes] = True
+            return np.flatnonzero(matched).tolist()
+
+        lists = []
+        for gram in {term[i : i + self.NGRAM] for i in range(len(term) - self.NGRAM + 1)}:
+            value_codes = self.postings.get(gram)
+            if value_codes is None:
+                return []
+            lists.append(value_codes)
+
+        lists.sort(key=len)
+        candidates = lists[0]
+        for value_codes in lists[1:]:
+            candidates = np.intersect1d(candidates, value_codes, assume_unique=True)
+            if candidates.size == 0:
+                return []
+        # Trigramas em comum não garantem a substring; confirma apenas nos candidatos
+        return [code for code in candidates.tolist() if term in self.values[code]]
+
+    def _match_prefix(self, term: str) -> List[int]:
+        lo = bisect.bisect_left(self.sorted_values, term)
+        hi = bisect.bisect_right(self.sorted_values, term + "\U0010ffff", lo)
+        return self.sorted_codes[lo:hi]
+
+    def search(self, term: str, prefix: bool = False) -> np.ndarray:
+        """
+        Retorna as posições (iloc), em ordem crescente, das linhas cujo valor contém o termo
+        (ou começa com ele, se prefix=True), sem diferenciar maiúsculas de minúsculas.
+        """
+        term = term.lower()
+        value_codes = self._match_prefix(term) if prefix else self._match_contains(term)
+        if not value_codes:
+            return np.empty(0, dtype=np.int64)
+        rows = np.concatenate([self.rows_order[self.bounds[code] : self.bounds[code + 1]] for code in value_codes])
+        rows.sort()
+        return rows
+
+    def rank(self, positions: np.ndarray, term: str) -> np.ndarray:
+        """
+        Ordena as posições por relevância em relação ao termo: igualdade exata, prefixo,
+        início de palavra e, por fim, posição da ocorrência e tamanho do valor.
+        """
+        term = term.lower()
+
+        def score(position: int):
+            value = self.values[self.codes[position]]
+            if value == term:
+                kind = 0
+            elif value.startswith(term):
+                kind = 1
+            elif f" {term}" in value:
+                kind = 2
+            else:
+                kind = 3
+            offset = value.find(term)
+            return (kind, offset if offset >= 0 else len(value), len(value))
+
+        return np.array(sorted(positions.tolist(), key=score), dtype=np.int64)
+
+
+class BitmapIndex:
+    """
+    Bitmaps de uma coluna de baixa cardinalidade (categoria, rating, disponibilidade): para cada valor distinto,
+    um vetor de bits compactado (np.packbits) com um bit por linha. Filtros viram OR entre valores da mesma
+    coluna e AND entre colunas, operações sobre n/8 bytes que não tocam no DataFrame.
+    """
+
+    def __init__(self, values: pd.Series, normalize=None):
+        self.size = len(values)
+        codes, uniques = pd.factorize(values)
+        if normalize is not None:
+            # Normaliza apenas os valores distintos e reagrupa os códigos (ex.: "Travel" e "travel")
+            normalized_codes, uniques = pd.factorize(pd.Index(uniques).map(normalize))
+            codes = np.where(codes >= 0, normalized_codes[codes], -1)
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        self.normalize = normalize
+        self.bitmaps: Dict = {}
+        for code, value in enumerate(uniques.tolist()):
+            mask = np.zeros(self.size, dtype=bool)
+            mask[order[bounds[code] : bounds[code + 1]]] = True
+            self.bitmaps[value] = np.packbits(mask)
+
+    def empty(self) -> np.ndarray:
+        return np.zeros((self.size + 7) // 8, dtype=np.uint8)
+
+    def match(self, values: Iterable) -> np.ndarray:
+        """
+        Retorna o bitmap das linhas com qualquer um dos valores informados (valores inexistentes não casam).
+        """
+        result = self.empty()
+        for value in values:
+            bitmap = self.bitmaps.get(self.normalize(value) if self.normalize is not None else value)
+            if bitmap is not None:
+                np.bitwise_or(result, bitmap, out=result)
+        return result
+
+
+def positions_bitmap(positions: np.ndarray, size: int) -> np.ndarray:
+    """
+    Converte posições (iloc) em bitmap compactado, para combinar com os bitmaps das colunas.
+    """
+    mask = np.zeros(size, dtype=bool)
+    mask[positions] = True
+    return np.packbits(mask)
+
+
+def _lower(value) -> str:
+    return str(value).strip().lower()
+
+
+class BookIndex:
+    """
+    Estruturas auxiliares construídas uma única vez a cada carga do DataFrame de livros.
+    Evitam que os endpoints precisem varrer o DataFrame inteiro a cada requisição.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.size = len(df)
+        ids = df["id"].to_numpy(dtype=np.int64) if "id" in df else np.empty(0, dtype=np.int64)
+
+        # Ordem estável por id, usada na paginação por cursor (keyset)
+        self.id_order = np.argsort(ids, kind="stable")
+        self.sorted_ids = ids[self.id_order]
+
+        # Payload de cada linha já convertido para dicionário, pronto para ser devolvido como Book
+        self.records: List[Dict] = df.to_dict("records") if self.size else []
+
+        # Mapa id -> posição; em ids duplicados prevalece a primeira ocorrência, como no filtro original
+        self.positions: Dict[int, int] = {}
+        for position, book_id in enumerate(ids.tolist()):
+            self.positions.setdefault(book_id, position)
+
+        # Preços ordenados (somente leitura) para consultas por faixa via busca binária; preços inválidos ficam de fora
+        prices = pd.to_numeric(df["price"], errors="coerce").to_numpy(dtype=np.float64) if "price" in df else np.empty(0)
+        priced = np.flatnonzero(~np.isnan(prices))
+        self.price_order = priced[np.argsort(prices[priced], kind="stable")]
+        self.sorted_prices = prices[self.price_order]
+        self.price_order.flags.writeable = False
+        self.sorted_prices.flags.writeable = False
+
+        # Índices de texto para a busca por título e categoria
+        self.title_search = TextIndex(df["title"] if "title" in df else pd.Series([], dtype=object))
+        self.category_search = TextIndex(df["category"] if "category" in df else pd.Series([], dtype=object))
+
+        # Bitmaps das colunas de baixa cardinalidade para a consulta combinada (categoria e disponibilidade sem
+        # diferenciar maiúsculas de minúsculas)
+        self.category_bitmaps = BitmapIndex(df["category"] if "category" in df else pd.Series([], dtype=object), _lower)
+        self.rating_bitmaps = BitmapIndex(df["rating"] if "rating" in df else pd.Series([], dtype=np.int64))
+        self.availability_bitmaps = BitmapIndex(df["availability"] if "availability" in df else pd.Series([], dtype=object), _lower)
+
+        # Colunas usadas para ordenar o resultado da consulta combinada
+        self.prices = prices
+        self.ratings = df["rating"].to_numpy() if "rating" in df else np.empty(0, dtype=np.int64)
+
+    def page_by_id(self, cursor: Optional[int], limit: Optional[int]) -> Tuple[Optional[np.ndarray], Optional[int]]:
+        """
+        Retorna as posições (iloc) da página iniciada após o id informado no cursor, em ordem de id,
+        e o cursor da próxima página (ou None na última página).
+        Sem cursor e sem limite, retorna None para indicar todas as linhas na ordem original.
+        """
+        if cursor is None and limit is None:
+            return None, None
+
+        start = 0 if cursor is None else int(np.searchsorted(self.sorted_ids, cursor, side="right"))
+        stop = self.size if limit is None else min(start + limit, self.size)
+        positions = self.id_order[start:stop]
+        next_cursor = int(self.sorted_ids[stop - 1]) if start < stop < self.size else None
+        return positions, next_cursor
+
+    def price_range(self, min_price: float, max_price: float, sort: Optional[str] = None, limit: Optional[int] = None) -> np.ndarray:
+        """
+        Retorna as posições (iloc) dos livros com preço entre min_price e max_price (inclusive) em O(log n + k).
+        sort="asc"/"desc" ordena por preço; sem sort, mantém a ordem original do dataset.
+        """
+        lo = int(np.searchsorted(self.sorted_prices, min_price, side="left"))
+        hi = int(np.searchsorted(self.sorted_prices, max_price, side="right"))
+
+        if sort == "asc":
+            positions = self.price_order[lo:hi]
+        elif sort == "desc":
+            positions = self.price_order[lo:hi][::-1]
+        else:
+            positions = np.sort(self.price_order[lo:hi])
+
+        return positions if limit is None else positions[:limit]
+
+    def query(
+        self,
+        categories: Optional[List[str]] = None,
+        ratings: Optional[List[int]] = None,
+        availability: Optional[List[str]] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        title: Optional[str] = None,
+        sort: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Tuple[np.ndarray, int]:
+        """
+        Combina os filtros informados pela interseção (AND) dos bitmaps: categorias, ratings e disponibilidades
+        (OR dentro de cada filtro), faixa de preço (índice ordenado) e termo no título (índice de trigramas).
+        Retorna as posições (iloc) do resultado, ordenado e limitado, e o total de linhas que casaram.
+        sort aceita price, -price, rating ou -rating; sem sort, mantém a ordem original do dataset.
+        """
+        bitmaps = []
+        if categories:
+            bitmaps.append(self.category_bitmaps.match(categories))
+        if ratings:
+            bitmaps.append(self.rating_bitmaps.match(ratings))
+        if availability:
+            bitmaps.append(self.availability_bitmaps.match(availability))
+        if min_price is not None or max_price is not None:
+            lo = 0 if min_price is None else int(np.searchsorted(self.sorted_prices, min_price, side="left"))
+            hi = len(self.sorted_prices) if max_price is None else int(np.searchsorted(self.sorted_prices, max_price, side="right"))
+            bitmaps.append(positions_bitmap(self.price_order[lo:hi], self.size))
+        if title:
+            bitmaps.append(positions_bitmap(self.title_search.search(title), self.size))
+
+        if not bitmaps:
+            positions = np.arange(self.size)
+        else:
+            # Começa pelo bitmap mais seletivo (estimado pelos bytes não nulos) e para assim que a interseção fica vazia
+            bitmaps.sort(key=lambda bitmap: int(np.count_nonzero(bitmap)))
+            result = bitmaps[0].copy()
+            for bitmap in bitmaps[1:]:
+                np.bitwise_and(result, bitmap, out=result)
+                if not result.any():
+                    break
+            positions = np.flatnonzero(np.unpackbits(result, count=self.size))
+        total = len(positions)
+
+        if sort:
+            column = self.prices if sort.lstrip("-") == "price" else self.ratings
+            keys = column[positions]
+            order = np.argsort(-keys if sort.startswith("-") else keys, kind="stable")
+            positions = positions[order]
+        return (positions if limit is None else positions[:limit]), total
+
+    def get(self, book_id: int) -> Optional[Dict]:
+        """
+        Retorna o payload do livro com o id informado em O(1), ou None se não existir.
+        """
+        position = self.positions.get(book_id)
+        return None if position is None else self.records[position]
+
+    def get_many(self, book_ids: List[int]) -> Tuple[List[Dict], List[int]]:
+        """
+        Resolve uma lista de ids, preservando a ordem solicitada.
+        Retorna os livros encontrados e os ids inexistentes.
+        """
+        found, missing = [], []
+        for book_id in book_ids:
+            record = self.get(book_id)
+            if record is None:
+                missing.append(book_id)
+            else:
+                found.append(record)
+        return found, missing
+
+    def records_at(self, positions: np.ndarray) -> List[Dict]:
+        """
+        Retorna os payloads das linhas nas posições informadas, na mesma ordem.
+        """
+        return [self.records[position] for position in positions.tolist()]
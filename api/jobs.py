@@ -0,0 +1,156 @@
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+import logging
+import threading
+import time
+import uuid
+
+# Reutiliza o logger definido em main.py
+logger = logging.getLogger("api_logger")
+
+# Quantidade de jobs finalizados mantidos em memória para consulta
+MAX_FINISHED_JOBS = 20
+
+
+class ScrapeJob:
+    """
+    Estado de um job de scraping executado em segundo plano.
+    Recebe as notificações de andamento do BookScraper (categories_found, page_fetched, page_stale, page_failed e category_done).
+    """
+
+    def __init__(self):
+        self.id = str(uuid.uuid4())
+        self.status = "pending"
+        self.created_at = datetime.utcnow()
+        self.message: Optional[str] = None
+        self.categories: Dict[str, Dict] = {}
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            self.status = "running"
+            self._started = time.perf_counter()
+
+    def finish(self, status: str, message: str):
+        with self._lock:
+            self.status = status
+            self.message = message
+            self._finished = time.perf_counter()
+
+    @property
+    def active(self) -> bool:
+        return self.status in ("pending", "running")
+
+    @staticmethod
+    def _new_progress() -> Dict:
+        return {"status": "pending", "pages_fetched": 0, "pages_stale": 0, "pages_failed": 0, "books_found": 0}
+
+    def categories_found(self, names: List[str]):
+        with self._lock:
+            for name in names:
+                self.categories.setdefault(name, self._new_progress())
+
+    def page_fetched(self, category: str, books_found: int):
+        with self._lock:
+            progress = self.categories.setdefault(category, self._new_progress())
+            progress["status"] = "running"
+            progress["pages_fetched"] += 1
+            progress["books_found"] = books_found
+
+    def page_stale(self, category: str, books_found: int):
+        """
+        Página que falhou no site e foi preenchida com a última versão em cache.
+        """
+        with self._lock:
+            progress = self.categories.setdefault(category, self._new_progress())
+            progress["status"] = "running"
+            progress["pages_stale"] += 1
+            progress["books_found"] = books_found
+
+    def page_failed(self, category: str):
+        with self._lock:
+            progress = self.categories.setdefault(category, self._new_progress())
+            progress["pages_failed"] += 1
+
+    def category_done(self, category: str, books_found: int):
+        with self._lock:
+            progress = self.categories.setdefault(category, self._new_progress())
+            progress["status"] = "incomplete" if progress["pages_failed"] else "completed"
+            progress["books_found"] = books_found
+
+    def to_dict(self) -> Dict:
+        """
+        Retorna um retrato consistente do andamento do job.
+        """
+        with self._lock:
+            categories = {name: dict(progress) for name, progress in self.categories.items()}
+            if self._started is None:
+                elapsed = 0.0
+            else:
+                elapsed = (self._finished or time.perf_counter()) - self._started
+            return {
+                "job_id": self.id,
+                "status": self.status,
+                "created_at": self.created_at,
+                "elapsed_seconds": round(elapsed, 3),
+                "categories_total": len(categories),
+                "categories_completed": sum(1 for progress in categories.values() if progress["status"] == "completed"),
+                "pages_fetched": sum(progress["pages_fetched"] for progress in categories.values()),
+                "pages_stale": sum(progress["pages_stale"] for progress in categories.values()),
+                "pages_failed": sum(progress["pages_failed"] for progress in categories.values()),
+                "books_found": sum(progress["books_found"] for progress in categories.values()),
+                "message": self.message,
+                "categories": categories,
+            }
+
+
+class ScrapeJobManager:
+    """
+    Executa os jobs de scraping em uma thread dedicada, fora do event loop, um de cada vez.
+    """
+
+    def __init__(self):
+        self.jobs: "OrderedDict[str, ScrapeJob]" = OrderedDict()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scrape-job")
+        self._lock = threading.Lock()
+
+    def submit(self, runner: Callable[[ScrapeJob], None]) -> ScrapeJob:
+        """
+        Agenda o runner em segundo plano e retorna o job imediatamente.
+        Se já houver um job em andamento, ele é retornado no lugar de um novo.
+        """
+        with self._lock:
+            for job in self.jobs.values():
+                if job.active:
+                    return job
+
+            job = ScrapeJob()
+            self.jobs[job.id] = job
+            self._evict()
+            self._executor.submit(self._run, runner, job)
+            logger.info(f"Job de scraping agendado: {job.id}")
+            return job
+
+    def get(self, job_id: str) -> Optional[ScrapeJob]:
+        return self.jobs.get(job_id)
+
+    def _evict(self):
+        finished = [job_id for job_id, job in self.jobs.items() if not job.active]
+        for job_id in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job_id]
+
+    def _run(self, runner: Callable[[ScrapeJob], None], job: ScrapeJob):
+        job.start()
+        try:
+            runner(job)
+        except Exception as e:
+            logger.error(f"Erro no job de scraping {job.id}: {str(e)}", exc_info=True)
+            job.finish("failed", str(e) or "Erro ao executar o scraping")
+
+
+# Instância única usada pelas rotas
+scrape_jobs = ScrapeJobManager()
@@ -0,0 +1,118 @@
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List
+import atexit
+import logging
+import os
+import queue
+import random
+
+import orjson
+
+# Capacidade da fila entre as threads que logam e a thread de escrita; registros excedentes são descartados
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+# Fração das requisições bem-sucedidas (status < 400) registradas no log de acesso; erros são sempre registrados
+ACCESS_LOG_SAMPLE_RATE = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", "1.0"))
+
+# Filas ativas por logger, para monitoramento e encerramento
+_pipelines: Dict[str, "QueuePipeline"] = {}
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    QueueHandler com fila limitada: se a thread de escrita não acompanhar, o registro é descartado
+    (e contado) em vez de bloquear a requisição.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formata o registro como uma linha JSON: horário (UTC), nível, mensagem e os campos
+    passados em extra={"fields": {...}}.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        return orjson.dumps(entry, default=str).decode()
+
+
+class QueuePipeline:
+    """
+    Liga um logger a uma fila: o logger só enfileira os registros e uma thread em segundo plano
+    (QueueListener) os entrega aos handlers de arquivo.
+    """
+
+    def __init__(self, logger: logging.Logger, handlers: List[logging.Handler], max_size: int = LOG_QUEUE_SIZE):
+        self.queue: queue.Queue = queue.Queue(max_size)
+        self.handler = DroppingQueueHandler(self.queue)
+        self.listener = QueueListener(self.queue, *handlers, respect_handler_level=True)
+        self.logger = logger
+
+    def start(self):
+        self.logger.addHandler(self.handler)
+        self.listener.start()
+
+    def stop(self):
+        """
+        Esvazia a fila (grava os registros pendentes) e encerra a thread de escrita.
+        """
+        self.logger.removeHandler(self.handler)
+        if self.listener._thread is not None:
+            self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+
+    def stats(self) -> Dict:
+        return {"queued": self.queue.qsize(), "dropped": self.handler.dropped}
+
+
+def setup_queue_logging(logger: logging.Logger, handlers: List[logging.Handler]) -> QueuePipeline:
+    """
+    Configura o logger para gravar pelos handlers informados através de uma fila,
+    tirando a escrita em disco da thread que gera o log.
+    """
+    previous = _pipelines.pop(logger.name, None)
+    if previous is not None:
+        previous.stop()
+    pipeline = QueuePipeline(logger, handlers)
+    pipeline.start()
+    _pipelines[logger.name] = pipeline
+    return pipeline
+
+
+def queue_stats() -> Dict[str, Dict]:
+    """
+    Retorna, por logger, os registros aguardando escrita e os descartados por fila cheia.
+    """
+    return {name: pipeline.stats() for name, pipeline in _pipelines.items()}
+
+
+def should_log_access(status_code: int, sample_rate: float = None) -> bool:
+    """
+    Decide se a requisição entra no log de acesso: erros sempre; sucessos conforme a taxa de amostragem.
+    """
+    rate = ACCESS_LOG_SAMPLE_RATE if sample_rate is None else sample_rate
+    return status_code >= 400 or rate >= 1.0 or random.random() < rate
+
+
+@atexit.register
+def _stop_pipelines():
+    for pipeline in list(_pipelines.values()):
+        pipeline.stop()
+    _pipelines.clear()
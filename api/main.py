@@ -1,10 +1,14 @@
 from fastapi import FastAPI, Request
-from fastapi.responses import Response
-from api.routes import books, auth, ml, scraper
+from fastapi.responses import ORJSONResponse, Response
+from api.routes import books, auth, ml, scraper, metrics
+from api.compression import CompressionMiddleware
+from api.log_pipeline import JsonFormatter, queue_stats, setup_queue_logging, should_log_access
+from api.metrics import MetricsMiddleware, registry
 import logging
 import time
 
-# Configuração de logging com dois arquivos: api.log (INFO) e api-error.log (ERROR)
+# Configuração de logging com dois arquivos: api.log (INFO) e api-error.log (ERROR).
+# Os handlers de arquivo são atendidos por uma thread de escrita; o logger apenas enfileira os registros.
 logger = logging.getLogger("api_logger")
 logger.setLevel(logging.INFO)
 
@@ -12,43 +16,60 @@ info_handler = logging.FileHandler("logs/api.log")
 info_handler.setLevel(logging.INFO)
 info_formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
 info_handler.setFormatter(info_formatter)
-logger.addHandler(info_handler)
 
 error_handler = logging.FileHandler("logs/api-error.log")
 error_handler.setLevel(logging.ERROR)
 error_formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
 error_handler.setFormatter(error_formatter)
-logger.addHandler(error_handler)
+setup_queue_logging(logger, [info_handler, error_handler])
 
-# Configuração de loggin com visão de monitoramento (estilo http server)
+# Configuração de logging com visão de monitoramento (estilo http server), uma linha JSON por requisição
 logger_http = logging.getLogger("http_logger")
 logger_http.setLevel(logging.INFO)
 http_handler = logging.FileHandler("logs/http.log")
-logger_http.addHandler(http_handler)
+http_handler.setFormatter(JsonFormatter())
+setup_queue_logging(logger_http, [http_handler])
+registry.callback(
+    "log_records_dropped_total",
+    "Registros de log descartados por fila cheia",
+    lambda: {name: stats["dropped"] for name, stats in queue_stats().items()},
+    labelnames=("logger",),
+    type="counter",
+)
 
-app = FastAPI(title="Books Scraper API", version="1.0.0")
+app = FastAPI(title="Books Scraper API", version="1.0.0", default_response_class=ORJSONResponse)
+
+# Compressão (brotli/gzip) negociada pelo Accept-Encoding para respostas a partir de 1 KB
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+# Métricas de latência e requisições em andamento, medidas por fora da compressão
+app.add_middleware(MetricsMiddleware)
 
 
 # Middleware para logar todas as requisições
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    start_time = time.time()
+    start_time = time.perf_counter()
     response: Response = await call_next(request)
-    process_time = time.time() - start_time
+    process_time = time.perf_counter() - start_time
 
-    # Dados semelhantes aos logs do Apache/Nginx
-    client_ip = request.client.host
-    method = request.method
-    url = str(request.url)
     status_code = response.status_code
-    user_agent = request.headers.get("user-agent", "-")
-
-    log_message = f'{client_ip} "{method} {url} HTTP/1.1" {status_code} "{user_agent}" {process_time:.2f}s'
+    if not should_log_access(status_code):
+        return response
 
-    if status_code >= 400:
-        logger_http.error(log_message)
-    else:
-        logger_http.info(log_message)
+    # Dados semelhantes aos logs do Apache/Nginx, como campos estruturados
+    fields = {
+        "client_ip": request.client.host if request.client else None,
+        "method": request.method,
+        "path": request.url.path,
+        "query": request.url.query or None,
+        "status": status_code,
+        "bytes": int(response.headers.get("content-length", 0)),
+        "user_agent": request.headers.get("user-agent", "-"),
+        "duration_ms": round(process_time * 1000, 3),
+    }
+    level = logging.ERROR if status_code >= 400 else logging.INFO
+    logger_http.log(level, "%s %s %s", fields["method"], fields["path"], status_code, extra={"fields": fields})
 
     return response
 
@@ -58,6 +79,7 @@ app.include_router(books.router)
 app.include_router(auth.router)
 app.include_router(ml.router)
 app.include_router(scraper.router)
+app.include_router(metrics.router)
 
 
 @app.on_event("startup")
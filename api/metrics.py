@@ -0,0 +1,310 @@
+from contextvars import ContextVar
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import math
+import threading
+import time
+
+# Limites (em segundos) dos buckets dos histogramas de latência
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Content-Type do formato texto de exposição do Prometheus
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class Metric:
+    """
+    Base das métricas do registro: nome, descrição, nomes dos labels e uma série por combinação de valores.
+    """
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Labels de {self.name} devem ser {self.labelnames}, recebidos {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterable[Tuple[str, Sequence[str], Sequence[str], float]]:
+        """
+        Retorna (sufixo, nomes dos labels, valores dos labels, valor) de cada amostra.
+        """
+        with self._lock:
+            series = list(self._series.items())
+        for key, value in series:
+            yield "", self.labelnames, key, value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for suffix, names, values, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(names, values)} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    """
+    Contador monotônico.
+    """
+
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """
+    Valor que sobe e desce (ex.: requisições em andamento, linhas do dataset).
+    """
+
+    type = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """
+    Histograma com buckets cumulativos, soma e contagem por série.
+    """
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0]
+            for position, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][position] += 1
+                    break
+            series[1] += value
+
+    def samples(self):
+        with self._lock:
+            series = [(key, list(counts), total) for key, (counts, total) in self._series.items()]
+        names = self.labelnames + ("le",)
+        for key, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield "_bucket", names, key + (_format_value(bound),), cumulative
+            yield "_sum", self.labelnames, key, total
+            yield "_count", self.labelnames, key, cumulative
+
+
+class CallbackMetric(Metric):
+    """
+    Métrica lida no momento da exposição, a partir de uma função.
+    A função retorna um número (série sem labels) ou um dicionário {valores dos labels: número}.
+    """
+
+    def __init__(self, name: str, documentation: str, func: Callable, labelnames: Sequence[str] = (), type: str = "gauge"):
+        super().__init__(name, documentation, labelnames)
+        self.func = func
+        self.type = type
+
+    def samples(self):
+        values = self.func()
+        if not isinstance(values, dict):
+            values = {(): values}
+        for key, value in values.items():
+            key = key if isinstance(key, tuple) else (key,)
+            yield "", self.labelnames, tuple(str(part) for part in key), value
+
+
+class MetricsRegistry:
+    """
+    Registro das métricas do processo, exposto no formato texto do Prometheus.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None and type(existing) is not type(metric):
+                raise ValueError(f"Métrica {metric.name} já registrada com outro tipo")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(self, name: str, documentation: str, func: Callable, labelnames: Sequence[str] = (), type: str = "gauge") -> CallbackMetric:
+        return self.register(CallbackMetric(name, documentation, func, labelnames, type))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# Requisições HTTP (por template da rota, para não criar uma série por id)
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "Duração das requisições HTTP, até o fim do corpo da resposta", ("method", "route", "status")
+)
+HTTP_REQUESTS_IN_FLIGHT = registry.gauge("http_requests_in_flight", "Requisições HTTP em andamento", ("method", "route"))
+
+# Carga do dataset
+DATASET_RELOAD_DURATION = registry.histogram(
+    "dataset_reload_duration_seconds", "Duração da carga do dataset (leitura e construção dos índices)", ("result",)
+)
+DATASET_ROWS = registry.gauge("dataset_rows", "Linhas do snapshot atual do dataset")
+DATASET_VERSION = registry.gauge("dataset_version", "Versão do snapshot atual do dataset")
+
+# Scraper
+SCRAPER_PAGES = registry.counter(
+    "scraper_pages_total", "Páginas de categoria obtidas pelo scraper, por resultado (parsed, unchanged, not_modified, stale)", ("category", "result")
+)
+SCRAPER_BYTES = registry.counter("scraper_bytes_total", "Bytes de corpo de resposta recebidos pelo scraper", ("category",))
+SCRAPER_PARSE_DURATION = registry.histogram(
+    "scraper_parse_duration_seconds",
+    "Tempo de extração dos livros de uma página de categoria",
+    ("category",),
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+SCRAPER_RETRIES = registry.counter("scraper_retries_total", "Requisições do scraper repetidas, por motivo (status HTTP ou transport)", ("reason",))
+SCRAPER_CONCURRENCY = registry.gauge("scraper_concurrency_limit", "Janela de concorrência adaptativa do scraper por host", ("host",))
+SCRAPER_ERRORS = registry.counter("scraper_errors_total", "Erros do scraper por categoria e tipo (status, transport, parse)", ("category", "kind"))
+
+
+# Modelo de ML
+ML_TRAINING_DURATION = registry.histogram("ml_training_duration_seconds", "Duração do treino do modelo de predição em segundo plano", ("result",))
+ML_MODEL_DATASET_VERSION = registry.gauge("ml_model_dataset_version", "Versão do dataset usada no treino do modelo em memória")
+ML_INFERENCE_DURATION = registry.histogram(
+    "ml_inference_duration_seconds",
+    "Tempo de inferência de um lote de predições (montagem da matriz e produto)",
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1),
+)
+ML_PREDICTIONS = registry.counter("ml_predictions_total", "Linhas pontuadas pelo modelo de predição")
+
+
+# Controle de admissão por rota (api/offload.py)
+ADMISSION_IN_FLIGHT = registry.gauge("admission_in_flight", "Requisições em andamento por rota com limite de concorrência", ("route",))
+ADMISSION_QUEUED = registry.gauge("admission_queued", "Requisições aguardando vaga por rota", ("route",))
+ADMISSION_QUEUE_WAIT = registry.histogram(
+    "admission_queue_wait_seconds",
+    "Espera por uma vaga na rota antes do processamento",
+    ("route",),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+ADMISSION_REJECTED = registry.counter("admission_rejected_total", "Requisições recusadas com 503 por rota e motivo (queue_full, timeout)", ("route", "reason"))
+
+# Template da rota da requisição em andamento, definido pelo MetricsMiddleware; usado pelo controle de admissão (api/offload.py)
+current_route: ContextVar[Optional[str]] = ContextVar("current_route", default=None)
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Retorna o caminho declarado da rota que atende a requisição (ex.: /api/v1/books/{book_id}).
+    O resultado fica em scope["route_template"], para que a tabela de rotas seja percorrida uma única vez por requisição.
+    """
+    cached = scope.get("route_template")
+    if cached is not None:
+        return cached
+    scope["route_template"] = template = _match_route(scope)
+    return template
+
+
+def _match_route(scope: Scope) -> str:
+    app = scope.get("app")
+    router = getattr(app, "router", None)
+    partial: Optional[str] = None
+    for route in getattr(router, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    return partial or "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que mede a duração das requisições por método, template da rota e status,
+    e mantém o gauge de requisições em andamento.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_template(scope)
+        current_route.set(route)
+        status_code = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc(method=method, route=route)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec(method=method, route=route)
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - start, method=method, route=route, status=status_code)
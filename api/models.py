@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from typing import Dict, Optional
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Dict, List, Optional
 
 
 class Book(BaseModel):
@@ -17,6 +18,23 @@ class Book(BaseModel):
     image_url: str
 
 
+class BookBatchRequest(BaseModel):
+    """
+    Modelo para consulta de vários livros por ID em uma única requisição.
+    """
+
+    ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+
+class BookBatchResponse(BaseModel):
+    """
+    Modelo para resposta da consulta em lote: livros encontrados e IDs inexistentes.
+    """
+
+    books: List[Book]
+    not_found: List[int]
+
+
 class Token(BaseModel):
     """
     Modelo para resposta de token JWT.
@@ -44,9 +62,61 @@ class User(BaseModel):
     password: Optional[str] = None
 
 
+class CategoryProgress(BaseModel):
+    """
+    Modelo para o andamento do scraping de uma categoria.
+    """
+
+    status: str
+    pages_fetched: int
+    pages_stale: int = 0
+    pages_failed: int = 0
+    books_found: int
+
+
+class ScrapeJobStatus(BaseModel):
+    """
+    Modelo para o status de um job de scraping em segundo plano.
+    """
+
+    job_id: str
+    status: str
+    created_at: datetime
+    elapsed_seconds: float
+    categories_total: int
+    categories_completed: int
+    pages_fetched: int
+    pages_stale: int = 0
+    pages_failed: int = 0
+    books_found: int
+    message: Optional[str] = None
+    categories: Dict[str, CategoryProgress]
+
+
 class PredictionInput(BaseModel):
     """
     Modelo para entrada de predições de ML.
+    As chaves são colunas da matriz de features (ex.: rating, category_Travel); ausentes valem 0.
     """
 
     features: Dict[str, float]
+
+
+class PredictionBatchRequest(BaseModel):
+    """
+    Modelo para predição em lote: uma linha de features por item.
+    """
+
+    inputs: List[PredictionInput] = Field(..., min_length=1, max_length=1000)
+
+
+class PredictionBatchResponse(BaseModel):
+    """
+    Modelo para resposta das predições: valores na ordem da entrada, versão do modelo e latência da inferência.
+    """
+
+    model_version: str
+    dataset_version: int
+    target: str
+    predictions: List[float]
+    latency_ms: float
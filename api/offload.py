@@ -0,0 +1,188 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+from typing import Any, Callable, Deque, Dict, Tuple
+from api.metrics import ADMISSION_IN_FLIGHT, ADMISSION_QUEUE_WAIT, ADMISSION_QUEUED, ADMISSION_REJECTED, current_route
+import asyncio
+import functools
+import logging
+import os
+
+# Reutiliza o logger definido em main.py
+logger = logging.getLogger("api_logger")
+
+# Threads do executor que roda consultas e serialização pesadas fora do event loop
+OFFLOAD_WORKERS = int(os.getenv("OFFLOAD_WORKERS", str(min(8, (os.cpu_count() or 1) + 2))))
+
+# Tempo máximo, em segundos, aguardando vaga antes de responder 503, e valor do header Retry-After
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "2.0"))
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "1"))
+
+# Limites por template de rota: (execuções simultâneas no executor, requisições aguardando vaga).
+# Rotas que devolvem o dataset inteiro têm limites menores; ADMISSION_ROUTE_LIMITS ("/api/v1/books=2:8,...") sobrescreve
+ROUTE_LIMITS: Dict[str, Tuple[int, int]] = {
+    "/api/v1/books": (2, 8),
+    "/api/v1/books/top-rated": (2, 8),
+    "/api/v1/ml/features": (2, 8),
+    "/api/v1/ml/training-data": (2, 8),
+    "/api/v1/books/search": (4, 32),
+    "/api/v1/books/query": (4, 32),
+    "/api/v1/books/price-range": (4, 32),
+    "/api/v1/books/batch": (4, 32),
+    "/api/v1/ml/predictions": (4, 32),
+}
+for item in filter(None, os.getenv("ADMISSION_ROUTE_LIMITS", "").split(",")):
+    path, _, limits = item.partition("=")
+    concurrency, _, queue_size = limits.partition(":")
+    ROUTE_LIMITS[path.strip()] = (int(concurrency), int(queue_size or 4 * int(concurrency)))
+
+
+class Overloaded(Exception):
+    """
+    Sinaliza que a rota não tem vaga (fila cheia ou espera acima de ADMISSION_QUEUE_TIMEOUT).
+    """
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class RouteLimiter:
+    """
+    Limite de concorrência de uma rota com fila limitada: até concurrency requisições em andamento e até
+    queue_size aguardando. Com a fila cheia, ou após queue_timeout segundos de espera, acquire levanta
+    Overloaded. Usado apenas dentro do event loop (sem lock).
+    """
+
+    def __init__(self, route: str, concurrency: int, queue_size: int, queue_timeout: float = ADMISSION_QUEUE_TIMEOUT):
+        self.route = route
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    def _reject(self, reason: str):
+        ADMISSION_REJECTED.inc(route=self.route, reason=reason)
+        logger.warning(f"Rota {self.route} sobrecarregada ({reason}): {self.in_flight} em andamento, {len(self._waiters)} na fila")
+        raise Overloaded(reason)
+
+    def _update_gauges(self):
+        ADMISSION_IN_FLIGHT.set(self.in_flight, route=self.route)
+        ADMISSION_QUEUED.set(len(self._waiters), route=self.route)
+
+    async def acquire(self):
+        if self.in_flight < self.concurrency and not self._waiters:
+            self.in_flight += 1
+            self._update_gauges()
+            return
+        if len(self._waiters) >= self.queue_size:
+            self._reject("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._update_gauges()
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._reject("timeout")
+        except asyncio.CancelledError:
+            # A vaga pode ter sido repassada no mesmo instante do cancelamento (cliente desconectado)
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            self._update_gauges()
+
+    def release(self):
+        # Repassa a vaga ao primeiro da fila que ainda aguarda; sem ninguém, a vaga é liberada
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._update_gauges()
+                return
+        self.in_flight -= 1
+        self._update_gauges()
+
+
+_executor = ThreadPoolExecutor(max_workers=OFFLOAD_WORKERS, thread_name_prefix="offload")
+_limiters: Dict[str, RouteLimiter] = {route: RouteLimiter(route, *limits) for route, limits in ROUTE_LIMITS.items()}
+
+
+class AdmittedResponse:
+    """
+    Mixin que mantém a vaga da rota até o fim do envio da resposta, incluindo a compressão feita pelo
+    CompressionMiddleware (no send) e a serialização em blocos das respostas em streaming.
+    """
+
+    limiter: RouteLimiter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.limiter.release()
+
+
+_admitted_classes: Dict[type, type] = {}
+
+
+def hold_until_sent(response: Response, limiter: RouteLimiter) -> Response:
+    """
+    Troca a classe da resposta por uma subclasse com AdmittedResponse, preservando corpo, headers e tipo original.
+    """
+    cls = type(response)
+    admitted = _admitted_classes.get(cls)
+    if admitted is None:
+        admitted = _admitted_classes[cls] = type(f"Admitted{cls.__name__}", (AdmittedResponse, cls), {})
+    response.__class__ = admitted
+    response.limiter = limiter
+    return response
+
+
+async def admit(limiter: RouteLimiter):
+    """
+    Aguarda uma vaga na rota; sem vaga, responde 503 com Retry-After.
+    """
+    start = asyncio.get_running_loop().time()
+    try:
+        await limiter.acquire()
+    except Overloaded:
+        raise HTTPException(
+            status_code=503,
+            detail="Servidor ocupado, tente novamente em instantes",
+            headers={"Retry-After": str(ADMISSION_RETRY_AFTER)},
+        )
+    ADMISSION_QUEUE_WAIT.observe(asyncio.get_running_loop().time() - start, route=limiter.route)
+
+
+async def offload(func: Callable, *args, heavy: bool = True, **kwargs) -> Any:
+    """
+    Executa func(*args, **kwargs) no executor, fora do event loop (consultas nos índices e serialização).
+
+    Com heavy=True, se a rota da requisição estiver em ROUTE_LIMITS, a execução só começa com uma vaga na rota.
+    O controle de admissão fica aqui, e não em um middleware, para valer apenas para o trabalho de fato executado:
+    respostas 304 e respostas em cache (CachedRoute) nunca chegam ao offload e não disputam vagas, e rotas
+    passam heavy=False para requisições baratas (ex.: páginas com limit). Se func devolver uma Response,
+    a vaga só é liberada ao fim do envio (compressão e streaming incluídos).
+    """
+    call = functools.partial(func, *args, **kwargs)
+    limiter = _limiters.get(current_route.get()) if heavy else None
+    if limiter is None:
+        return await asyncio.get_running_loop().run_in_executor(_executor, call)
+
+    await admit(limiter)
+    try:
+        result = await asyncio.get_running_loop().run_in_executor(_executor, call)
+    except BaseException:
+        limiter.release()
+        raise
+    if isinstance(result, Response):
+        return hold_until_sent(result, limiter)
+    limiter.release()
+    return result
@@ -0,0 +1,40 @@
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from typing import Dict, Iterator, List, Optional
+from api.indexes import BookIndex
+import numpy as np
+import orjson
+
+# Tamanho máximo de página aceito pelos endpoints paginados
+MAX_PAGE_SIZE = 1000
+
+# Quantidade de linhas serializadas por bloco no modo streaming
+NDJSON_CHUNK_SIZE = 500
+
+
+def iter_ndjson(records: List[Dict], positions: Optional[np.ndarray] = None, chunk_size: int = NDJSON_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Serializa as linhas em NDJSON, um bloco por vez, sem materializar a resposta inteira.
+    Se positions for None, todas as linhas são enviadas na ordem original.
+    """
+    total = len(records) if positions is None else len(positions)
+    for start in range(0, total, chunk_size):
+        if positions is None:
+            chunk = records[start : start + chunk_size]
+        else:
+            chunk = [records[position] for position in positions[start : start + chunk_size].tolist()]
+        yield b"".join(orjson.dumps(record) + b"\n" for record in chunk)
+
+
+def paginated_records(index: BookIndex, limit: Optional[int], cursor: Optional[int], stream: bool):
+    """
+    Aplica a paginação por cursor (keyset no id) e devolve a lista de registros ou uma resposta NDJSON em streaming.
+    O cursor da próxima página é informado no header X-Next-Cursor.
+    """
+    positions, next_cursor = index.page_by_id(cursor, limit)
+    headers = {"X-Next-Cursor": str(next_cursor)} if next_cursor is not None else {}
+
+    if stream:
+        return StreamingResponse(iter_ndjson(index.records, positions), media_type="application/x-ndjson", headers=headers)
+
+    page = index.records if positions is None else index.records_at(positions)
+    return ORJSONResponse(page, headers=headers)
@@ -0,0 +1,149 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+from api.features import MISSING_CODE, FeatureMatrix, get_features
+from api.metrics import ML_MODEL_DATASET_VERSION, ML_TRAINING_DURATION
+import numpy as np
+import pandas as pd
+import logging
+import os
+import threading
+import time
+
+# Reutiliza o logger definido em main.py
+logger = logging.getLogger("api_logger")
+
+# Regularização da regressão ridge
+RIDGE_ALPHA = float(os.getenv("ML_RIDGE_ALPHA", "1.0"))
+
+
+class PriceModel:
+    """
+    Regressão ridge do preço a partir do rating e da categoria (one-hot), treinada sobre a matriz de features.
+
+    Como cada linha tem uma única categoria ativa, X^T X e X^T y são montados com np.bincount sobre os códigos
+    de categoria, sem materializar a matriz densa: o treino é O(linhas) e resolve um sistema
+    (1 + categorias) x (1 + categorias). As colunas one-hot fazem o papel do intercepto; livros sem categoria
+    entram apenas pelo rating.
+    """
+
+    target = "price"
+
+    def __init__(self, features: FeatureMatrix, alpha: float = RIDGE_ALPHA):
+        if features.shape[0] == 0:
+            raise ValueError("Dataset vazio, não há linhas para treinar o modelo")
+        self.dataset_version = features.version
+        self.version = f"price-ridge-v{features.version}"
+        self.trained_at = datetime.utcnow()
+        self.rows = features.shape[0]
+        # rating seguido de category_<nome>, na mesma ordem da matriz de features
+        self.feature_columns: List[str] = features.columns[1:]
+        self._column_index = {name: position for position, name in enumerate(self.feature_columns)}
+
+        rating = features.rating.astype(np.float64)
+        price, codes = features.price, features.codes
+        categories = len(features.categories)
+        # Linhas sem categoria (MISSING_CODE) não têm coluna one-hot ativa e ficam fora das somas por categoria
+        known = codes != MISSING_CODE
+        cross = np.bincount(codes[known], weights=rating[known], minlength=categories)
+        xtx = np.zeros((categories + 1, categories + 1))
+        xtx[0, 0] = rating @ rating
+        xtx[0, 1:] = cross
+        xtx[1:, 0] = cross
+        xtx[1:, 1:][np.diag_indices(categories)] = np.bincount(codes[known], minlength=categories)
+        xty = np.concatenate(([rating @ price], np.bincount(codes[known], weights=price[known], minlength=categories)))
+        self.coef = np.linalg.solve(xtx + alpha * np.eye(categories + 1), xty)
+
+        category_terms = np.zeros(len(price))
+        category_terms[known] = self.coef[1:][codes[known]]
+        residuals = price - (rating * self.coef[0] + category_terms)
+        self.rmse = float(np.sqrt(np.mean(residuals**2)))
+
+    def design_matrix(self, rows: List[Dict[str, float]]) -> np.ndarray:
+        """
+        Monta a matriz densa do lote com uma única atribuição vetorizada. Features ausentes valem 0;
+        nomes desconhecidos geram ValueError.
+        """
+        row_positions, column_positions, values, unknown = [], [], [], set()
+        for position, features in enumerate(rows):
+            for name, value in features.items():
+                column = self._column_index.get(name)
+                if column is None:
+                    unknown.add(name)
+                    continue
+                row_positions.append(position)
+                column_positions.append(column)
+                values.append(value)
+        if unknown:
+            raise ValueError(f"Features desconhecidas: {', '.join(sorted(unknown))}")
+        matrix = np.zeros((len(rows), len(self.feature_columns)))
+        matrix[row_positions, column_positions] = values
+        return matrix
+
+    def predict(self, rows: List[Dict[str, float]]) -> np.ndarray:
+        """
+        Pontua o lote inteiro com um único produto matriz-vetor.
+        """
+        return self.design_matrix(rows) @ self.coef
+
+    def info(self) -> Dict:
+        return {
+            "model_version": self.version,
+            "dataset_version": self.dataset_version,
+            "target": self.target,
+            "trained_at": self.trained_at.isoformat(),
+            "rows": self.rows,
+            "rmse": round(self.rmse, 4),
+            "feature_columns": self.feature_columns,
+        }
+
+
+# Modelo em uso; substituído por inteiro quando o treino de uma versão mais nova termina
+_model: Optional[PriceModel] = None
+_model_lock = threading.Lock()
+
+# Um treino por vez; recargas em sequência descartam os treinos de versões já superadas
+_training_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ml-train")
+_scheduled_version = 0
+
+
+def current_model() -> Optional[PriceModel]:
+    """
+    Retorna o modelo em memória, ou None se nenhum treino terminou ainda.
+    """
+    return _model
+
+
+def schedule_training(df: pd.DataFrame, version: int):
+    """
+    Agenda o treino do modelo para a versão do dataset recém-carregada, sem bloquear a recarga.
+    """
+    global _scheduled_version
+    _scheduled_version = version
+    _training_executor.submit(_train, df, version)
+
+
+def _train(df: pd.DataFrame, version: int):
+    global _model
+    if version != _scheduled_version:
+        logger.info(f"Treino da versão {version} do dataset descartado: há uma versão mais nova agendada")
+        return
+    if df.empty:
+        logger.warning(f"Dataset da versão {version} vazio, mantendo o modelo atual")
+        return
+
+    start = time.perf_counter()
+    try:
+        model = PriceModel(get_features(df, version))
+    except Exception as e:
+        ML_TRAINING_DURATION.observe(time.perf_counter() - start, result="error")
+        logger.error(f"Erro ao treinar o modelo para a versão {version} do dataset: {str(e)}", exc_info=True)
+        return
+    elapsed = time.perf_counter() - start
+    ML_TRAINING_DURATION.observe(elapsed, result="success")
+
+    with _model_lock:
+        if _model is None or model.dataset_version >= _model.dataset_version:
+            _model = model
+            ML_MODEL_DATASET_VERSION.set(model.dataset_version)
+    logger.info(f"Modelo {model.version} treinado em {elapsed * 1000:.1f} ms com {model.rows} linhas (RMSE {model.rmse:.2f})")
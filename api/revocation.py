@@ -0,0 +1,161 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Optional
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+# Reutiliza o logger definido em main.py
+logger = logging.getLogger("api_logger")
+
+# Implementação do armazenamento de tokens revogados: "sqlite" (compartilhado entre workers) ou "memory"
+REVOCATION_STORE = os.getenv("REVOCATION_STORE", "sqlite")
+REVOCATION_DB = os.getenv("REVOCATION_DB", "data/revoked-tokens.sqlite")
+
+# Por quanto tempo, em segundos, uma consulta negativa ("não revogado") é reaproveitada em memória.
+# Limita o atraso para um worker enxergar uma revogação feita por outro.
+REVOCATION_CACHE_TTL = float(os.getenv("REVOCATION_CACHE_TTL", "1.0"))
+REVOCATION_CACHE_SIZE = 10000
+
+
+class RevocationStore(ABC):
+    """
+    Interface dos armazenamentos de tokens revogados (identificados pelo jti).
+    Cada entrada vale até o instante de expiração do token; depois disso pode ser descartada,
+    pois o próprio token já não é aceito.
+    """
+
+    @abstractmethod
+    def revoke(self, jti: str, expires_at: float):
+        """
+        Registra o jti como revogado até expires_at.
+        """
+
+    @abstractmethod
+    def is_revoked(self, jti: str) -> bool:
+        """
+        Indica se o jti está revogado e ainda não expirou.
+        """
+
+    @abstractmethod
+    def purge(self):
+        """
+        Remove as entradas já expiradas.
+        """
+
+
+class MemoryRevocationStore(RevocationStore):
+    """
+    Armazenamento em memória, restrito ao processo. Adequado para um único worker.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def revoke(self, jti: str, expires_at: float):
+        with self._lock:
+            self._entries[jti] = expires_at
+        self.purge()
+
+    def is_revoked(self, jti: str) -> bool:
+        expires_at = self._entries.get(jti)
+        return expires_at is not None and expires_at > time.time()
+
+    def purge(self):
+        now = time.time()
+        with self._lock:
+            for jti in [jti for jti, expires_at in self._entries.items() if expires_at <= now]:
+                del self._entries[jti]
+
+
+class SQLiteRevocationStore(RevocationStore):
+    """
+    Armazenamento em SQLite, compartilhado por todos os workers que apontam para o mesmo arquivo.
+    Usa WAL para que leituras não bloqueiem as gravações e uma conexão por thread.
+    """
+
+    def __init__(self, path: str = REVOCATION_DB):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS revoked_tokens (jti TEXT PRIMARY KEY, expires_at REAL NOT NULL)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def revoke(self, jti: str, expires_at: float):
+        with self._connection() as conn:
+            conn.execute("INSERT OR REPLACE INTO revoked_tokens (jti, expires_at) VALUES (?, ?)", (jti, expires_at))
+        self.purge()
+
+    def is_revoked(self, jti: str) -> bool:
+        row = self._connection().execute("SELECT 1 FROM revoked_tokens WHERE jti = ? AND expires_at > ?", (jti, time.time())).fetchone()
+        return row is not None
+
+    def purge(self):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM revoked_tokens WHERE expires_at <= ?", (time.time(),))
+
+
+class CachedRevocationStore(RevocationStore):
+    """
+    Cache em memória (LRU limitado) na frente de outro armazenamento, para que a verificação
+    de revogação não consulte o armazenamento compartilhado a cada requisição.
+    Revogações ficam no cache enquanto couberem no LRU; respostas negativas, por REVOCATION_CACHE_TTL segundos.
+    """
+
+    def __init__(self, store: RevocationStore, ttl: float = REVOCATION_CACHE_TTL, max_size: int = REVOCATION_CACHE_SIZE):
+        self.store = store
+        self.ttl = ttl
+        self.max_size = max_size
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, jti: str, revoked: bool, valid_until: float):
+        with self._lock:
+            self._cache[jti] = (revoked, valid_until)
+            self._cache.move_to_end(jti)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+    def revoke(self, jti: str, expires_at: float):
+        self.store.revoke(jti, expires_at)
+        self._remember(jti, True, float("inf"))
+
+    def is_revoked(self, jti: str) -> bool:
+        now = time.time()
+        cached: Optional[tuple] = self._cache.get(jti)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+        revoked = self.store.is_revoked(jti)
+        # Uma revogação não é desfeita (e o token expirado já é recusado na decodificação): não precisa ser reconsultada
+        self._remember(jti, revoked, float("inf") if revoked else now + self.ttl)
+        return revoked
+
+    def purge(self):
+        self.store.purge()
+
+
+def create_revocation_store() -> RevocationStore:
+    """
+    Cria o armazenamento configurado em REVOCATION_STORE, envolto pelo cache em memória.
+    """
+    if REVOCATION_STORE == "memory":
+        store = MemoryRevocationStore()
+    else:
+        try:
+            store = SQLiteRevocationStore(REVOCATION_DB)
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao abrir o armazenamento de tokens revogados {REVOCATION_DB}: {str(e)}", exc_info=True)
+            store = MemoryRevocationStore()
+    logger.info(f"Armazenamento de tokens revogados: {type(store).__name__}")
+    return CachedRevocationStore(store)
@@ -1,4 +1,5 @@
 from fastapi import Request, APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from api.models import Token, User
 from api.dependencies import create_access_token, verify_password, fake_users_db, revoke_token, oauth2_scheme, get_current_user, SECRET_KEY
@@ -44,7 +45,7 @@ async def refresh_token(request: Request, current_user: dict = Depends(get_curre
         payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
         jti = payload.get("jti")
         if jti:
-            revoke_token(jti)
+            await run_in_threadpool(revoke_token, jti, payload.get("exp"))
         access_token = create_access_token(data={"sub": current_user["username"]})
         return {"access_token": access_token, "token_type": "bearer"}
     except HTTPException as e:
@@ -1,115 +1,185 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List, Dict
-from api.models import Book
-from api.dependencies import get_books_data, get_current_user
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
+from typing import List, Dict, Optional
+from api.models import Book, BookBatchRequest, BookBatchResponse
+from api.dependencies import get_books_data, get_books_index, get_books_stats, get_current_user, token_cache
+from api.aggregates import MAX_TOP_N, BookStats
+from api.indexes import BookIndex
+from api.pagination import MAX_PAGE_SIZE, paginated_records
+from api.http_cache import CachedRoute, no_http_cache
+from api.log_pipeline import queue_stats
+from api.offload import offload
+import numpy as np
 import pandas as pd
 import logging
 
 # Reutiliza o logger definido em main.py
 logger = logging.getLogger("api_logger")
 
-router = APIRouter(prefix="/api/v1", tags=["books"])
+router = APIRouter(prefix="/api/v1", tags=["books"], route_class=CachedRoute)
 
 
 @router.get("/books", response_model=List[Book])
-async def get_all_books(df: pd.DataFrame = Depends(get_books_data)):
+async def get_all_books(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Quantidade máxima de livros por página"),
+    cursor: Optional[int] = Query(None, description="Último id retornado na página anterior (header X-Next-Cursor)"),
+    stream: bool = Query(False, description="Retorna os livros em NDJSON via streaming"),
+    index: BookIndex = Depends(get_books_index),
+):
     """
     Lista todos os livros disponíveis na base de dados.
+    Com limit e/ou cursor, pagina por id; com stream=true, envia NDJSON em blocos.
+    Apenas a listagem completa (sem limit ou em streaming) disputa as vagas da rota; páginas são baratas.
     """
     logger.debug("Listando todos os livros")
-    return df.to_dict("records")
+    return await offload(paginated_records, index, limit, cursor, stream, heavy=limit is None or stream)
 
 
 @router.get("/books/search", response_model=List[Book])
-async def search_books(title: str = None, category: str = None, df: pd.DataFrame = Depends(get_books_data)):
+async def search_books(
+    title: str = None,
+    category: str = None,
+    match: str = Query("substring", pattern="^(substring|prefix)$", description="Tipo de correspondência: substring ou prefix"),
+    rank: bool = Query(False, description="Ordena os resultados por relevância"),
+    index: BookIndex = Depends(get_books_index),
+):
     """
     Busca livros por título, categoria ou ambos. Pelo menos um parâmetro deve ser fornecido.
+    A busca é case-insensitive e usa os índices de trigramas construídos na carga dos dados.
     """
     if not title and not category:
         logger.error("Busca inválida: nenhum parâmetro (title ou category) fornecido")
         raise HTTPException(status_code=400, detail="Pelo menos um parâmetro (title ou category) deve ser fornecido")
 
-    result = df
-    if title:
-        result = result[result["title"].str.contains(title, case=False, na=False)]
-    if category:
-        result = result[result["category"].str.contains(category, case=False, na=False)]
+    prefix = match == "prefix"
 
-    logger.debug(f"Busca realizada - Título: {title}, Categoria: {category}, Resultados: {len(result)}")
-    return result.to_dict("records")
+    def run():
+        result = None
+        if title:
+            result = index.title_search.search(title, prefix)
+        if category:
+            by_category = index.category_search.search(category, prefix)
+            result = by_category if result is None else np.intersect1d(result, by_category, assume_unique=True)
+
+        if rank:
+            result = index.title_search.rank(result, title) if title else index.category_search.rank(result, category)
+
+        logger.debug("Busca realizada - Título: %s, Categoria: %s, Resultados: %s", title, category, len(result))
+        return ORJSONResponse(index.records_at(result))
+
+    return await offload(run)
 
 
 @router.get("/categories")
-async def get_categories(df: pd.DataFrame = Depends(get_books_data)):
+async def get_categories(stats: BookStats = Depends(get_books_stats)):
     """
     Lista todas as categorias de livros disponíveis.
     """
-    categories = df["category"].unique().tolist()
-    logger.debug(f"Listando {len(categories)} categorias")
+    categories = stats.category_names
+    logger.debug("Listando %s categorias", len(categories))
     return {"categories": categories}
 
 
 @router.get("/health")
+@no_http_cache
 async def health_check(df: pd.DataFrame = Depends(get_books_data)):
     """
     Verifica o status da API e conectividade com os dados.
+    Inclui os contadores do cache de tokens verificados (taxa de acerto) e das filas de log
+    (registros pendentes e descartados) para monitoramento.
     """
-    status = {"api_status": "healthy", "data_loaded": not df.empty}
+    status = {"api_status": "healthy", "data_loaded": not df.empty, "token_cache": token_cache.stats(), "logging": queue_stats()}
     logger.debug("Verificação de saúde da API realizada")
     return status
 
 
 @router.get("/stats/overview")
-async def get_stats_overview(df: pd.DataFrame = Depends(get_books_data)):
+async def get_stats_overview(stats: BookStats = Depends(get_books_stats)):
     """
-    Retorna estatísticas gerais da coleção.
+    Retorna estatísticas gerais da coleção, pré-calculadas a cada carga do dataset.
     """
-    stats = {
-        "total_books": len(df),
-        "average_price": float(df["price"].mean()) if not df.empty else 0.0,
-        "rating_distribution": df["rating"].value_counts().to_dict(),
-    }
     logger.debug("Estatísticas gerais retornadas")
-    return stats
+    return stats.overview
 
 
 @router.get("/stats/categories")
-async def get_stats_categories(df: pd.DataFrame = Depends(get_books_data)):
+async def get_stats_categories(stats: BookStats = Depends(get_books_stats)):
     """
-    Retorna estatísticas detalhadas por categoria (quantidade de livros e preços).
+    Retorna estatísticas detalhadas por categoria (quantidade de livros e preços), pré-calculadas a cada carga do dataset.
     """
-    try:
-        stats = df.groupby("category").agg({"title": "count", "price": ["mean", "min", "max"]}).reset_index()
-        stats.columns = ["category", "total_books", "avg_price", "min_price", "max_price"]
-        stats_dict = stats.to_dict("records")
-        logger.debug("Estatísticas por categoria retornadas")
-        return stats_dict
-    except Exception as e:
-        logger.error(f"Erro ao calcular estatísticas por categoria: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail="Erro ao calcular estatísticas por categoria")
+    logger.debug("Estatísticas por categoria retornadas")
+    return stats.categories
+
+
+@router.get("/stats/dashboard")
+async def get_stats_dashboard(
+    top: int = Query(5, ge=1, le=MAX_TOP_N, description="Quantidade de livros no ranking por preço"),
+    stats: BookStats = Depends(get_books_stats),
+):
+    """
+    Retorna o resumo pré-calculado usado pelo dashboard: totais, contagem por rating, contagem por categoria
+    e os livros mais caros. O ETag muda apenas quando o dataset muda, permitindo revalidar com If-None-Match.
+    """
+    logger.debug("Resumo do dashboard retornado")
+    return stats.dashboard(top)
+
+
+@router.get("/books/query", response_model=List[Book])
+async def query_books(
+    category: Optional[List[str]] = Query(None, description="Categorias aceitas (repita o parâmetro para várias)"),
+    rating: Optional[List[int]] = Query(None, description="Ratings aceitos, de 1 a 5 (repita o parâmetro para vários)"),
+    availability: Optional[List[str]] = Query(None, description="Disponibilidades aceitas (ex.: In stock)"),
+    min_price: Optional[float] = Query(None, ge=0, description="Preço mínimo (inclusive)"),
+    max_price: Optional[float] = Query(None, ge=0, description="Preço máximo (inclusive)"),
+    title: Optional[str] = Query(None, min_length=1, description="Termo contido no título (case-insensitive)"),
+    sort: Optional[str] = Query(None, pattern="^-?(price|rating)$", description="Ordenação: price, -price, rating ou -rating"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE, description="Quantidade máxima de livros retornados"),
+    index: BookIndex = Depends(get_books_index),
+):
+    """
+    Consulta combinada: categoria, rating, disponibilidade, faixa de preço e termo no título, com ordenação e limite.
+    Os filtros são resolvidos pela interseção dos bitmaps e índices construídos na carga dos dados, sem varrer
+    o DataFrame. O total de livros que atendem aos filtros é informado no header X-Total-Count.
+    """
+    if min_price is not None and max_price is not None and max_price < min_price:
+        logger.error(f"Parâmetro max_price inválido: {max_price} (deve ser maior ou igual a min_price)")
+        raise HTTPException(status_code=400, detail="max_price deve ser maior ou igual a min_price")
+
+    def run():
+        positions, total = index.query(category, rating, availability, min_price, max_price, title, sort, limit)
+        logger.debug("Consulta combinada: %s livros encontrados, %s retornados", total, len(positions))
+        return ORJSONResponse(index.records_at(positions), headers={"X-Total-Count": str(total)})
+
+    return await offload(run)
 
 
 @router.get("/books/top-rated", response_model=List[Book])
-async def get_top_rated_books(df: pd.DataFrame = Depends(get_books_data)):
+async def get_top_rated_books(index: BookIndex = Depends(get_books_index)):
     """
-    Lista os livros com a melhor avaliação (rating 5).
+    Lista os livros com a melhor avaliação (rating 5), a partir do bitmap de ratings construído na carga dos dados.
     """
-    try:
-        top_rated = df[df["rating"] == 5]
-        if top_rated.empty:
+    def run():
+        top_rated, total = index.query(ratings=[5])
+        if total == 0:
             logger.info("Nenhum livro com rating 5 encontrado")
             return []
-        logger.debug(f"Retornados {len(top_rated)} livros com rating 5")
-        return top_rated.to_dict("records")
-    except Exception as e:
-        logger.error(f"Erro ao buscar livros top-rated: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail="Erro ao buscar livros top-rated")
+        logger.debug("Retornados %s livros com rating 5", total)
+        return ORJSONResponse(index.records_at(top_rated))
+
+    return await offload(run)
 
 
 @router.get("/books/price-range", response_model=List[Book])
-async def get_books_by_price_range(min_price: float = 0.0, max_price: float = float("inf"), df: pd.DataFrame = Depends(get_books_data)):
+async def get_books_by_price_range(
+    min_price: float = 0.0,
+    max_price: float = float("inf"),
+    sort: Optional[str] = Query(None, pattern="^(asc|desc)$", description="Ordena por preço: asc ou desc"),
+    limit: Optional[int] = Query(None, ge=1, description="Quantidade máxima de livros retornados"),
+    index: BookIndex = Depends(get_books_index),
+):
     """
     Filtra livros dentro de uma faixa de preço específica.
+    Usa o índice de preços ordenado, sem alterar o DataFrame compartilhado.
     """
     if min_price < 0:
         logger.error(f"Parâmetro min_price inválido: {min_price} (deve ser não-negativo)")
@@ -118,21 +188,36 @@ async def get_books_by_price_range(min_price: float = 0.0, max_price: float = fl
         logger.error(f"Parâmetro max_price inválido: {max_price} (deve ser maior ou igual a min_price)")
         raise HTTPException(status_code=400, detail="max_price deve ser maior ou igual a min_price")
 
-    df["price"] = pd.to_numeric(df["price"], errors="coerce")
-    filtered = df[(df["price"] >= min_price) & (df["price"] <= max_price) & (df["price"].notna())]
+    def run():
+        filtered = index.price_range(min_price, max_price, sort, limit)
+        logger.debug("Filtrados %s livros na faixa de preço %s a %s", len(filtered), min_price, max_price)
+        return ORJSONResponse(index.records_at(filtered))
+
+    return await offload(run)
+
+
+@router.post("/books/batch", response_model=BookBatchResponse)
+async def get_books_batch(request: BookBatchRequest, index: BookIndex = Depends(get_books_index)):
+    """
+    Retorna vários livros pelos IDs informados em uma única requisição, na ordem solicitada.
+    IDs inexistentes são devolvidos em not_found.
+    """
+    def run():
+        books, not_found = index.get_many(request.ids)
+        logger.debug("Consulta em lote: %s livros encontrados, %s IDs inexistentes", len(books), len(not_found))
+        return ORJSONResponse({"books": books, "not_found": not_found})
 
-    logger.debug(f"Filtrados {len(filtered)} livros na faixa de preço {min_price} a {max_price}")
-    return filtered.to_dict("records")
+    return await offload(run)
 
 
 @router.get("/books/{book_id}", response_model=Book)
-async def get_book_by_id(book_id: int, df: pd.DataFrame = Depends(get_books_data)):
+async def get_book_by_id(book_id: int, index: BookIndex = Depends(get_books_index)):
     """
     Retorna detalhes de um livro específico pelo ID (inteiro).
     """
-    book = df[df["id"] == book_id]
-    if book.empty:
+    book = index.get(book_id)
+    if book is None:
         logger.error(f"Livro com ID {book_id} não encontrado")
         raise HTTPException(status_code=404, detail="Livro não encontrado")
-    logger.debug(f"Retornado livro com ID {book_id}")
-    return book.iloc[0].to_dict()
+    logger.debug("Retornado livro com ID %s", book_id)
+    return ORJSONResponse(book)
@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+from api.metrics import CONTENT_TYPE, registry
+import logging
+
+# Reutiliza o logger definido em main.py
+logger = logging.getLogger("api_logger")
+
+router = APIRouter(tags=["monitoring"])
+
+
+@router.get("/metrics", response_class=Response)
+async def get_metrics():
+    """
+    Expõe as métricas do processo no formato texto do Prometheus
+    (latência por rota, requisições em andamento, carga do dataset e scraper).
+    """
+    return Response(registry.render(), media_type=CONTENT_TYPE)
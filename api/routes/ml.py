@@ -1,40 +1,110 @@
-from fastapi import APIRouter, Depends
-from api.models import PredictionInput
-from api.dependencies import get_books_data
-import pandas as pd
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from api.models import PredictionBatchRequest, PredictionBatchResponse
+from api.dependencies import get_books_features, get_books_index
+from api.features import FeatureMatrix
+from api.indexes import BookIndex
+from api.metrics import ML_INFERENCE_DURATION, ML_PREDICTIONS
+from api.pagination import MAX_PAGE_SIZE, paginated_records
+from api.http_cache import CachedRoute, no_http_cache
+from api.predictor import PriceModel, current_model
+from api.offload import offload
 import logging
+import time
 
 # Reutiliza o logger definido em main.py
 logger = logging.getLogger("api_logger")
 
-router = APIRouter(prefix="/api/v1/ml", tags=["ml"])
+router = APIRouter(prefix="/api/v1/ml", tags=["ml"], route_class=CachedRoute)
 
 
 @router.get("/features")
-async def get_ml_features(df: pd.DataFrame = Depends(get_books_data)):
+async def get_ml_features(
+    format: str = Query("json", pattern="^(json|npz|arrow|ndjson)$", description="Formato: json, npz, arrow ou ndjson"),
+    features: FeatureMatrix = Depends(get_books_features),
+):
     """
     Retorna dados formatados para features de ML (ex.: preço, rating, dummy variables para categoria).
+    A matriz é montada uma vez por versão do dataset. json mantém a lista densa original; npz (matriz esparsa
+    CSR do scipy) e arrow (Arrow IPC) são formatos binários compactos; ndjson envia apenas os valores não nulos.
+    A ordem das colunas vai no próprio arquivo (chave columns do npz, metadado feature_columns do arrow).
     """
-    features = df[["price", "rating", "category"]].copy()
-    features = pd.get_dummies(features, columns=["category"], prefix="category")
-    logger.info("Features para ML retornadas")
-    return features.to_dict("records")
+    headers = {"X-Dataset-Version": str(features.version)}
+    logger.info(f"Features para ML retornadas ({format})")
+    if format == "npz":
+        headers["Content-Disposition"] = 'attachment; filename="features.npz"'
+        return Response(await offload(features.to_npz), media_type="application/x-npz", headers=headers)
+    if format == "arrow":
+        try:
+            body = await offload(features.to_arrow)
+        except RuntimeError as e:
+            logger.error(f"Formato arrow indisponível: {str(e)}")
+            raise HTTPException(status_code=400, detail="Formato arrow indisponível no servidor")
+        return Response(body, media_type="application/vnd.apache.arrow.stream", headers=headers)
+    # As respostas em streaming passam pelo offload para ocupar uma vaga da rota até o fim do envio
+    if format == "ndjson":
+        return await offload(StreamingResponse, features.iter_ndjson(), media_type="application/x-ndjson", headers=headers)
+    return await offload(StreamingResponse, features.iter_json(), media_type="application/json", headers=headers)
 
 
 @router.get("/training-data")
-async def get_training_data(df: pd.DataFrame = Depends(get_books_data)):
+async def get_training_data(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Quantidade máxima de linhas por página"),
+    cursor: Optional[int] = Query(None, description="Último id retornado na página anterior (header X-Next-Cursor)"),
+    stream: bool = Query(False, description="Retorna o dataset em NDJSON via streaming"),
+    index: BookIndex = Depends(get_books_index),
+):
     """
     Retorna dataset completo para treinamento de ML.
+    Com limit e/ou cursor, pagina por id; com stream=true, envia NDJSON em blocos.
+    Apenas o dataset completo (sem limit ou em streaming) disputa as vagas da rota; páginas são baratas.
     """
     logger.info("Dataset de treinamento retornado")
-    return df.to_dict("records")
+    return await offload(paginated_records, index, limit, cursor, stream, heavy=limit is None or stream)
 
 
-@router.post("/predictions")
-async def make_predictions():
+def get_model() -> PriceModel:
     """
-    Recebe features e retorna predições (apenas um mock).
+    Retorna o modelo em memória; enquanto o primeiro treino não termina, responde 503.
     """
-    logger.info(f"Predições solicitadas")
-    # Mock: retorna a soma dos valores das features como predição
-    return {"prediction": "it's a simple example"}
+    model = current_model()
+    if model is None:
+        logger.warning("Predição solicitada antes do primeiro treino do modelo")
+        raise HTTPException(status_code=503, detail="Modelo ainda não treinado", headers={"Retry-After": "1"})
+    return model
+
+
+@router.get("/model")
+@no_http_cache
+async def get_model_info(model: PriceModel = Depends(get_model)):
+    """
+    Retorna a versão do modelo em memória, o alvo, o erro no treino e as colunas de features aceitas.
+    """
+    return model.info()
+
+
+@router.post("/predictions", response_model=PredictionBatchResponse)
+async def make_predictions(request: PredictionBatchRequest, model: PriceModel = Depends(get_model)):
+    """
+    Recebe um lote de linhas de features e retorna as predições de preço, calculadas de uma vez para o lote.
+    """
+    def run():
+        start = time.perf_counter()
+        return model.predict([item.features for item in request.inputs]), time.perf_counter() - start
+
+    try:
+        predictions, elapsed = await offload(run)
+    except ValueError as e:
+        logger.error(f"Erro nas features enviadas para predição: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    ML_INFERENCE_DURATION.observe(elapsed)
+    ML_PREDICTIONS.inc(len(predictions))
+    logger.info(f"{len(predictions)} predições calculadas pelo modelo {model.version} em {elapsed * 1000:.2f} ms")
+    return {
+        "model_version": model.version,
+        "dataset_version": model.dataset_version,
+        "target": model.target,
+        "predictions": predictions.tolist(),
+        "latency_ms": round(elapsed * 1000, 3),
+    }
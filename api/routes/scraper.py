@@ -1,12 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List, Dict
-from api.models import Book
+from api.models import Book, ScrapeJobStatus
 from api.dependencies import get_books_data, get_current_user
 import pandas as pd
 import logging
 from api.scrapper.bookScraper import BookScraper
-from api.dependencies import load_books_data
-import csv
+from api.scrapper.httpCache import PageCache
+from api.dependencies import load_books_data, DATA_FILE
+from api.dataset import write_books_snapshot
+from api.jobs import ScrapeJob, scrape_jobs
 
 # Reutiliza o logger definido em main.py
 logger = logging.getLogger("api_logger")
@@ -14,36 +16,66 @@ logger = logging.getLogger("api_logger")
 router = APIRouter(prefix="/api/v1", tags=["scraper"])
 
 
-@router.post("/scraping/trigger")
-async def trigger_scraping(current_user: dict = Depends(get_current_user)):
+def run_scraping(job: ScrapeJob):
     """
-    Endpoint protegido para disparar o scraping (admin apenas).
+    Executa o scraping completo em segundo plano, salva o CSV e recarrega os dados.
+    Páginas que não mudaram desde o último scraping são reaproveitadas do cache em disco.
+    Se alguma página não puder ser obtida, o job falha e o CSV atual é mantido.
     """
-    try:
-        scraper = BookScraper()
-        books = scraper.scrape_all()
+    scraper = BookScraper(progress=job, cache=PageCache())
+    books = scraper.scrape_all()
+
+    if not books:
+        logger.error("Nenhum livro extraído durante o scraping")
+        job.finish("failed", "Nenhum livro extraído durante o scraping")
+        return
 
-        if not books:
-            logger.error("Nenhum livro extraído durante o scraping")
-            raise HTTPException(status_code=500, detail="Nenhum livro extraído durante o scraping")
+    # Um scraping incompleto não substitui o dataset atual
+    if scraper.failed_pages:
+        message = f"Scraping incompleto: {len(scraper.failed_pages)} páginas não puderam ser obtidas; dados atuais mantidos"
+        logger.error(message)
+        job.finish("failed", message)
+        return
 
-        with open("data/books.csv", "w", newline="", encoding="utf-8") as csvfile:
-            fieldnames = ["id", "title", "href", "price", "rating", "availability", "category", "image_url"]
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(books)
+    # Grava o CSV e o snapshot colunar em arquivos temporários e os substitui de forma atômica
+    write_books_snapshot(books, DATA_FILE)
 
-        logger.info(f"Scraping concluído: {len(books)} livros salvos")
+    logger.info(f"Scraping concluído: {len(books)} livros salvos")
 
-        # Recarrega o novo csv para não precisar reiniciar a aplicação
-        load_books_data()
+    # Recarrega o novo csv para não precisar reiniciar a aplicação
+    load_books_data()
 
-        return {"message": f"{len(books)} livros extraídos e salvos"}
+    message = f"{len(books)} livros extraídos e salvos"
+    stale = scraper.cache_stats["stale"]
+    if stale:
+        message += f" ({stale} páginas reaproveitadas do cache após falha no site)"
+    job.finish("completed", message)
 
-    except HTTPException as e:
-        logger.error(f"Erro ao executar scraping: {str(e)}", exc_info=True)
-        raise e
+
+@router.post("/scraping/trigger", status_code=status.HTTP_202_ACCEPTED)
+async def trigger_scraping(current_user: dict = Depends(get_current_user)):
+    """
+    Endpoint protegido para disparar o scraping (admin apenas).
+    O scraping é executado em segundo plano; o andamento pode ser consultado em /scraping/jobs/{job_id}.
+    Se já houver um scraping em andamento, retorna o job existente.
+    """
+    try:
+        job = scrape_jobs.submit(run_scraping)
+        return {"message": "Scraping em andamento", "job_id": job.id, "status": job.status}
 
     except Exception as e:
-        logger.error(f"Erro ao executar scraping: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail="Erro ao executar o scraping")
+        logger.error(f"Erro ao agendar scraping: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Erro ao agendar o scraping")
+
+
+@router.get("/scraping/jobs/{job_id}", response_model=ScrapeJobStatus)
+async def get_scraping_job(job_id: str, current_user: dict = Depends(get_current_user)):
+    """
+    Endpoint protegido que retorna o andamento de um job de scraping: progresso por categoria,
+    páginas baixadas, livros encontrados e tempo decorrido.
+    """
+    job = scrape_jobs.get(job_id)
+    if job is None:
+        logger.error(f"Job de scraping {job_id} não encontrado")
+        raise HTTPException(status_code=404, detail="Job de scraping não encontrado")
+    return job.to_dict()
@@ -1,10 +1,20 @@
-import requests
+import asyncio
+import httpx
 from bs4 import BeautifulSoup
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import re
+from lxml import etree
 import logging
-from urllib.parse import urljoin
+import os
 import hashlib
+from api.scrapper.httpCache import PageCache
+from api.scrapper.pageExtractor import SoupExtractor, clean_price, create_extractor
+from api.scrapper.rateLimiter import AdaptiveLimiter
+from api.log_pipeline import setup_queue_logging
+from api.metrics import SCRAPER_BYTES, SCRAPER_ERRORS, SCRAPER_PAGES, SCRAPER_PARSE_DURATION, SCRAPER_RETRIES
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+import random
+import time
 
 logger = logging.getLogger("scraper_logger")
 logger.setLevel(logging.INFO)
@@ -13,55 +23,138 @@ info_handler = logging.FileHandler("logs/scrapper.log")
 info_handler.setLevel(logging.INFO)
 info_formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
 info_handler.setFormatter(info_formatter)
-logger.addHandler(info_handler)
 
 error_handler = logging.FileHandler("logs/scrapper-error.log")
 error_handler.setLevel(logging.ERROR)
 error_formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
 error_handler.setFormatter(error_formatter)
-logger.addHandler(error_handler)
+
+# A escrita em disco fica na thread do QueueListener, fora do event loop do scraper
+setup_queue_logging(logger, [info_handler, error_handler])
 
 
 class BookScraper:
     """
     Classe para realizar web scraping no site https://books.toscrape.com/.
-    Otimizada com sessão de requests para reutilização de conexões e threading para paralelismo em categorias.
+    Usa asyncio com um pool de conexões limitado: após ler a primeira página de cada categoria,
+    descobre o total de páginas e baixa as demais em paralelo. As requisições de cada host passam por um
+    AdaptiveLimiter (taxa máxima e concorrência adaptativa) e falhas temporárias são repetidas com backoff.
     """
 
-    def __init__(self):
+    # Concorrência inicial por host; a janela se ajusta entre MIN_CONCURRENCY e CONCURRENCY_CEILING
+    MAX_CONCURRENCY = 20
+    MIN_CONCURRENCY = 2
+    CONCURRENCY_CEILING = 64
+
+    # Taxa máxima de requisições por segundo para cada host
+    RATE_LIMIT = float(os.getenv("SCRAPER_RATE_LIMIT", "500"))
+
+    # Tempo máximo, em segundos, de cada requisição
+    TIMEOUT = 10
+
+    # Novas tentativas para falhas temporárias, com backoff exponencial (com jitter) a partir de BACKOFF_BASE segundos
+    MAX_RETRIES = int(os.getenv("SCRAPER_MAX_RETRIES", "4"))
+    BACKOFF_BASE = 0.25
+    BACKOFF_MAX = 8.0
+    RETRY_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(self, progress=None, base_url: str = None, max_concurrency: int = None, cache: PageCache = None, extractor: str = None):
         """
-        Inicializa o scraper com uma sessão de requests para otimizar performance em múltiplas requisições
+        Inicializa o scraper.
+        O parâmetro progress (opcional) recebe notificações de andamento: categories_found, page_fetched, page_stale, page_failed e category_done.
+        A URL base pode ser alterada (por exemplo, para uma réplica local) via parâmetro ou variável SCRAPER_BASE_URL.
+        Com um PageCache, as páginas são pedidas de forma condicional e páginas sem alteração não são reprocessadas.
+        O extractor escolhe o backend de extração das páginas ("lxml" ou "bs4"; padrão em SCRAPER_EXTRACTOR).
         """
-        self.session = requests.Session()
-        self.base_url = "https://books.toscrape.com/"
-
-        # O rating será convertido para inteiro para facilitar pesquisas posteriores
-        self.RATING_MAP = {"One": 1, "Two": 2, "Three": 3, "Four": 4, "Five": 5}
+        self.progress = progress
+        self.cache = cache
+        self.cache_stats = {"not_modified": 0, "unchanged": 0, "parsed": 0, "stale": 0}
+        self.base_url = base_url or os.getenv("SCRAPER_BASE_URL", "https://books.toscrape.com/")
+        if not self.base_url.endswith("/"):
+            self.base_url += "/"
+        self.max_concurrency = max_concurrency or self.MAX_CONCURRENCY
+        self.failed_pages = []
+        self._limiters: Dict[str, AdaptiveLimiter] = {}
+        self.extractor = create_extractor(extractor)
+        self.fallback_extractor = SoupExtractor()
 
     def clean_price(self, valor: str) -> float:
         """
         Limpa o valor de preço removendo caracteres não numéricos e convertendo para float.
-        Trata vírgulas como separadores decimais se necessário.
         """
-        try:
-            # Remove tudo que não seja dígito, vírgula ou ponto
-            valor_limpo = re.sub(r"[^0-9,\.]", "", valor)
-            # Substitui vírgula por ponto (caso seja separador decimal)
-            if "," in valor_limpo and "." not in valor_limpo:
-                valor_limpo = valor_limpo.replace(",", ".")
-            return float(valor_limpo)
-        except ValueError as e:
-            logger.error(f"Erro ao converter preço '{valor}': {str(e)}", exc_info=True)
-            return 0.0  # Retorna 0.0 em caso de erro na conversão
-
-    def get_categories(self):
+        return clean_price(valor)
+
+    def _limiter(self, url: str) -> AdaptiveLimiter:
+        host = urlsplit(url).netloc
+        limiter = self._limiters.get(host)
+        if limiter is None:
+            limiter = self._limiters[host] = AdaptiveLimiter(
+                host, self.RATE_LIMIT, self.max_concurrency, self.MIN_CONCURRENCY, max(self.CONCURRENCY_CEILING, self.max_concurrency)
+            )
+        return limiter
+
+    def _backoff(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        """
+        Espera antes da próxima tentativa: backoff exponencial com jitter completo,
+        respeitando o Retry-After do servidor quando informado.
+        """
+        delay = random.uniform(0, min(self.BACKOFF_MAX, self.BACKOFF_BASE * 2**attempt))
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                try:
+                    delay = max(delay, parsedate_to_datetime(retry_after).timestamp() - time.time())
+                except (TypeError, ValueError):
+                    pass
+        return min(delay, self.BACKOFF_MAX)
+
+    async def _fetch(self, client: httpx.AsyncClient, url: str, headers: dict = None) -> httpx.Response:
+        """
+        Executa um GET sob o limitador do host, repetindo respostas 429/5xx e falhas de conexão até MAX_RETRIES vezes.
+        Esgotadas as tentativas, retorna a última resposta ou propaga o último erro. Os demais erros do httpx
+        (DecodingError, TooManyRedirects) não são repetidos e, como o cancelamento, apenas devolvem a vaga.
+        """
+        limiter = self._limiter(url)
+        attempt = 0
+        while True:
+            await limiter.acquire()
+            start = time.perf_counter()
+            response, error = None, None
+            try:
+                response = await client.get(url, headers=headers)
+            except httpx.TransportError as e:
+                error = e
+            finally:
+                if response is None and error is None:
+                    await limiter.abandon()
+            retryable = error is not None or response.status_code in self.RETRY_STATUS
+            throttled = response is not None and response.status_code == 429
+            await limiter.release(time.perf_counter() - start, overloaded=retryable, throttled=throttled)
+
+            if not retryable or attempt >= self.MAX_RETRIES:
+                if error is not None:
+                    raise error
+                return response
+
+            delay = self._backoff(attempt, response)
+            attempt += 1
+            reason = str(response.status_code) if response is not None else "transport"
+            SCRAPER_RETRIES.inc(reason=reason)
+            if throttled:
+                limiter.pause(delay)
+            logger.warning(f"Falha temporária ({reason}) em {url}; tentativa {attempt} de {self.MAX_RETRIES} em {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    async def get_categories(self, client: httpx.AsyncClient):
         """
         Obtém a lista de categorias do site, com nomes e URLs associadas.
         Retorna um dicionário {categoria: url}.
         """
         try:
             logger.info(f"Iniciando pesquisa de categorias")
-            response = self.session.get(self.base_url, timeout=10)
+            response = await self._fetch(client, self.base_url)
             response.raise_for_status()
             soup = BeautifulSoup(response.text, "lxml")  # Usa lxml para parsing mais rápido.
 
@@ -73,96 +166,168 @@ class BookScraper:
 
             logger.info(f"Total de categorias encontradas [{len(categories)}]")
             return categories
-        except (requests.exceptions.RequestException, ValueError) as e:
+        except (httpx.HTTPError, ValueError) as e:
+            SCRAPER_ERRORS.inc(category="", kind="categories")
             logger.error(f"Erro ao obter categorias: {str(e)}", exc_info=True)
             logger.info(f"Erro ao obter categorias. Verifique o arquivo scraper.log para detalhes.")
             return {}
 
-    def scrape_category(self, category_name, category_url):
+    def parse_category_page(self, html: str, category_name: str, page: int):
         """
-        Copia todos os livros de uma categoria específica, paginando até o final.
-        Retorna uma lista de dicionários com dados dos livros.
-        Otimizado para parar ao detectar ausência de próxima página.
+        Extrai os livros de uma página de categoria.
+        Retorna a lista de livros e o total de páginas da categoria informado no paginador (1 se não houver).
+        Se o backend rápido não conseguir processar o documento, a página é extraída com o BeautifulSoup.
         """
-        books = []
-        page = 1
-        while True:
-            try:
-                if page > 1:
-                    page_url = category_url.replace("index.html", f"page-{page}.html")
-                else:
-                    page_url = category_url
-
-                response = self.session.get(page_url, timeout=10)
-                if response.status_code != 200:
-                    break
-                soup = BeautifulSoup(response.text, "lxml")
-
-                for article in soup.select("ol.row li article.product_pod"):
-                    try:
-                        # Extrai dados da página da categoria
-                        title = article.h3.a["title"]
-                        price = article.select_one("p.price_color").text.strip()
-                        price_only = self.clean_price(price)
-                        rating = self.RATING_MAP.get(article.p["class"][1], 0)  # Extrai de 'star-rating X' -> 'X'
-                        availability = article.select_one("p.availability").text.strip()
-                        image_src = article.img["src"].replace("../", "")
-                        image_url = self.base_url + image_src
-                        book_url = urljoin(self.base_url, article.h3.a["href"].replace("../../../", "catalogue/"))
-
-                        # Gerar ID único baseado em hash
-                        unique_str = f"{title}_{category_name}"
-                        book_id = int(hashlib.md5(unique_str.encode()).hexdigest(), 16) % (10**8)
-
-                        books.append(
-                            {
-                                "id": book_id,
-                                "title": title,
-                                "href": book_url,
-                                "price": price_only,
-                                "rating": rating,
-                                "availability": availability,
-                                "category": category_name,
-                                "image_url": image_url,
-                            }
-                        )
-                    except (requests.exceptions.RequestException, AttributeError) as e:
-                        logger.error(f"Erro ao raspar livro na categoria {category_name}, página {page}: {str(e)}", exc_info=True)
-                        continue
-
-                if not soup.select_one("li.next"):
-                    break
-                page += 1
-
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Erro ao acessar página {page} da categoria {category_name}: {str(e)}", exc_info=True)
-                break
+        try:
+            return self.extractor.parse(html, category_name, page, self.base_url)
+        except (etree.LxmlError, ValueError) as e:
+            if self.extractor.name == self.fallback_extractor.name:
+                raise
+            logger.warning(f"Extrator {self.extractor.name} falhou na categoria {category_name}, página {page} ({str(e)}); usando bs4")
+            return self.fallback_extractor.parse(html, category_name, page, self.base_url)
+
+    async def scrape_page(self, client: httpx.AsyncClient, category_name: str, page_url: str, page: int):
+        """
+        Baixa e extrai uma página de categoria.
+        Com cache, envia uma requisição condicional e reaproveita os livros da página se o servidor
+        responder 304 ou se o conteúdo tiver o mesmo hash da última extração.
+        Se a página não puder ser obtida mesmo após as novas tentativas, usa os livros da última extração
+        guardada no cache; sem cache, registra a falha em failed_pages e retorna None.
+        """
+        cached = self.cache.get(page_url) if self.cache else None
+        if cached and cached["category"] != category_name:
+            cached = None
+        try:
+            headers = self.cache.conditional_headers(page_url) if cached else None
+            response = await self._fetch(client, page_url, headers)
+            if response.status_code == 304 and cached:
+                self.cache_stats["not_modified"] += 1
+                SCRAPER_PAGES.inc(category=category_name, result="not_modified")
+                result = cached["books"], cached["page_count"]
+            elif response.status_code != 200:
+                SCRAPER_ERRORS.inc(category=category_name, kind="status")
+                logger.error(f"Página {page} da categoria {category_name} retornou status {response.status_code}")
+                return self._page_failed(category_name, page_url, cached)
+            else:
+                result = None
+        except httpx.HTTPError as e:
+            SCRAPER_ERRORS.inc(category=category_name, kind="transport")
+            logger.error(f"Erro ao acessar página {page} da categoria {category_name}: {str(e)}", exc_info=True)
+            return self._page_failed(category_name, page_url, cached)
+
+        if result is None:
+            SCRAPER_BYTES.inc(len(response.content), category=category_name)
+            body_hash = hashlib.sha256(response.content).hexdigest()
+            if cached and cached["body_hash"] == body_hash:
+                self.cache_stats["unchanged"] += 1
+                SCRAPER_PAGES.inc(category=category_name, result="unchanged")
+                result = cached["books"], cached["page_count"]
+            else:
+                self.cache_stats["parsed"] += 1
+                SCRAPER_PAGES.inc(category=category_name, result="parsed")
+                start = time.perf_counter()
+                result = self.parse_category_page(response.text, category_name, page)
+                SCRAPER_PARSE_DURATION.observe(time.perf_counter() - start, category=category_name)
+            if self.cache:
+                self.cache.put(
+                    page_url, response.headers.get("etag"), response.headers.get("last-modified"), body_hash, category_name, result[1], result[0]
+                )
+
+        books, page_count = result
+        if self.progress:
+            self.progress.page_fetched(category_name, len(books))
+        return list(books), page_count
+
+    def _page_failed(self, category_name: str, page_url: str, cached: Optional[Dict]):
+        if cached:
+            self.cache_stats["stale"] += 1
+            SCRAPER_PAGES.inc(category=category_name, result="stale")
+            logger.warning(f"Usando a última versão em cache de {page_url}")
+            if self.progress:
+                self.progress.page_stale(category_name, len(cached["books"]))
+            return list(cached["books"]), cached["page_count"]
+        self.failed_pages.append(page_url)
+        if self.progress:
+            self.progress.page_failed(category_name)
+        return None
+
+    async def scrape_category(self, client: httpx.AsyncClient, category_name, category_url):
+        """
+        Copia todos os livros de uma categoria específica.
+        Lê a primeira página para descobrir o total de páginas e baixa as demais concorrentemente.
+        Retorna uma lista de dicionários com dados dos livros, na ordem das páginas.
+        """
+        first = await self.scrape_page(client, category_name, category_url, 1)
+        if first is None:
+            return []
+        books, page_count = first
+
+        if page_count > 1:
+            pages = await asyncio.gather(
+                *[
+                    self.scrape_page(client, category_name, category_url.replace("index.html", f"page-{page}.html"), page)
+                    for page in range(2, page_count + 1)
+                ]
+            )
+            for result in pages:
+                if result is not None:
+                    books.extend(result[0])
 
         logger.info(f"{len(books)} livros encontrados na categoria {category_name} e url {category_url}")
+        if self.progress:
+            self.progress.category_done(category_name, len(books))
         return books
 
-    def scrape_all(self):
+    async def scrape_all_async(self):
         """
-        Copia todos os livros de todas as categorias em paralelo usando threading.
-        Retorna uma lista consolidada de todos os livros.
-        Otimizado com ThreadPoolExecutor para processar categorias simultaneamente (máx. 10 workers para evitar sobrecarga no servidor).
+        Copia todos os livros de todas as categorias, com concorrência no nível de páginas.
+        Retorna uma lista consolidada de todos os livros, na ordem das categorias.
+        Páginas que não puderam ser obtidas ficam em failed_pages (lista vazia quando o scraping está completo).
         """
-        try:
-            categories = self.get_categories()
+        self.failed_pages = []
+        self._limiters = {}
+        connections = max(self.CONCURRENCY_CEILING, self.max_concurrency)
+        limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+        async with httpx.AsyncClient(limits=limits, timeout=self.TIMEOUT) as client:
+            categories = await self.get_categories(client)
             if not categories:
                 return []
+            if self.progress:
+                self.progress.categories_found(list(categories))
+
+            results = await asyncio.gather(
+                *[self.scrape_category(client, name, url) for name, url in categories.items()],
+                return_exceptions=True,
+            )
+
+        if self.cache:
+            self.cache.save()
+            logger.info(
+                f"Cache de páginas: {self.cache_stats['not_modified']} não modificadas (304), "
+                f"{self.cache_stats['unchanged']} com conteúdo igual, {self.cache_stats['parsed']} processadas, "
+                f"{self.cache_stats['stale']} reaproveitadas após falha"
+            )
+
+        all_books = []
+        for (name, url), result in zip(categories.items(), results):
+            if isinstance(result, Exception):
+                logger.error(f"Erro ao processar categoria {name}: {str(result)}", exc_info=result)
+                self.failed_pages.append(url)
+                continue
+            all_books.extend(result)
 
-            all_books = []
-            with ThreadPoolExecutor(max_workers=10) as executor:
-                futures = [executor.submit(self.scrape_category, name, url) for name, url in categories.items()]
-                for future in as_completed(futures):
-                    try:
-                        all_books.extend(future.result())
-                    except Exception as e:
-                        logger.error(f"Erro ao processar categoria: {str(e)}", exc_info=True)
-
-            logger.info(f"Total de {len(all_books)} livros encontrados")
-            return all_books
+        logger.info(f"Total de {len(all_books)} livros encontrados")
+        if self.failed_pages:
+            logger.error(f"Scraping incompleto: {len(self.failed_pages)} páginas não puderam ser obtidas")
+        return all_books
+
+    def scrape_all(self):
+        """
+        Ponto de entrada síncrono: executa o scraping assíncrono em um event loop próprio.
+        Deve ser chamado fora de um event loop em execução (por exemplo, na thread do job de scraping).
+        """
+        try:
+            return asyncio.run(self.scrape_all_async())
         except Exception as e:
             logger.error(f"Erro geral no scraping: {str(e)}", exc_info=True)
             return []
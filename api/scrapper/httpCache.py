@@ -0,0 +1,103 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("scraper_logger")
+
+# Arquivo padrão do cache de páginas do scraper
+DEFAULT_CACHE_FILE = os.getenv("SCRAPER_CACHE_FILE", "data/scraper-cache.sqlite")
+
+
+class PageCache:
+    """
+    Cache persistente (SQLite) das páginas de categoria já raspadas, indexado pela URL.
+    Para cada página guarda os validadores HTTP (ETag e Last-Modified), o hash do conteúdo
+    e os livros extraídos, permitindo requisições condicionais e o reaproveitamento das linhas
+    de páginas que não mudaram. As entradas ficam em memória durante o scraping e são gravadas ao final.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_FILE):
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+        self._dirty: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        try:
+            with self._connect() as conn:
+                for url, etag, last_modified, body_hash, category, page_count, books in conn.execute(
+                    "SELECT url, etag, last_modified, body_hash, category, page_count, books FROM pages"
+                ):
+                    self.entries[url] = {
+                        "etag": etag,
+                        "last_modified": last_modified,
+                        "body_hash": body_hash,
+                        "category": category,
+                        "page_count": page_count,
+                        "books": json.loads(books),
+                    }
+            logger.info(f"Cache de páginas carregado: {len(self.entries)} entradas")
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao carregar o cache de páginas {path}: {str(e)}", exc_info=True)
+
+    def _connect(self) -> sqlite3.Connection:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, body_hash TEXT, "
+            "category TEXT, page_count INTEGER, books TEXT)"
+        )
+        return conn
+
+    def get(self, url: str) -> Optional[Dict]:
+        return self.entries.get(url)
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """
+        Retorna os headers de requisição condicional (If-None-Match / If-Modified-Since) para a URL.
+        """
+        entry = self.entries.get(url)
+        headers = {}
+        if entry:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(self, url: str, etag: Optional[str], last_modified: Optional[str], body_hash: str, category: str, page_count: int, books: List[Dict]):
+        entry = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "body_hash": body_hash,
+            "category": category,
+            "page_count": page_count,
+            "books": books,
+        }
+        with self._lock:
+            self.entries[url] = entry
+            self._dirty[url] = entry
+
+    def save(self):
+        """
+        Grava no disco, em uma única transação, as entradas alteradas durante o scraping.
+        """
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+        if not dirty:
+            return
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO pages (url, etag, last_modified, body_hash, category, page_count, books) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (url, e["etag"], e["last_modified"], e["body_hash"], e["category"], e["page_count"], json.dumps(e["books"], ensure_ascii=False))
+                        for url, e in dirty.items()
+                    ],
+                )
+            logger.info(f"Cache de páginas gravado: {len(dirty)} entradas atualizadas")
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao gravar o cache de páginas {self.path}: {str(e)}", exc_info=True)
@@ -0,0 +1,157 @@
+import hashlib
+import logging
+import os
+import re
+from typing import Dict, List, Tuple
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+from lxml import etree
+
+from api.metrics import SCRAPER_ERRORS
+
+logger = logging.getLogger("scraper_logger")
+
+# Backend de extração usado por padrão: "lxml" (XPath compilado) ou "bs4" (BeautifulSoup)
+DEFAULT_EXTRACTOR = os.getenv("SCRAPER_EXTRACTOR", "lxml")
+
+# O rating será convertido para inteiro para facilitar pesquisas posteriores
+RATING_MAP = {"One": 1, "Two": 2, "Three": 3, "Four": 4, "Five": 5}
+
+PAGE_COUNT_RE = re.compile(r"Page\s+\d+\s+of\s+(\d+)")
+
+
+def clean_price(valor: str) -> float:
+    """
+    Limpa o valor de preço removendo caracteres não numéricos e convertendo para float.
+    Trata vírgulas como separadores decimais se necessário.
+    """
+    try:
+        # Remove tudo que não seja dígito, vírgula ou ponto
+        valor_limpo = re.sub(r"[^0-9,\.]", "", valor)
+        # Substitui vírgula por ponto (caso seja separador decimal)
+        if "," in valor_limpo and "." not in valor_limpo:
+            valor_limpo = valor_limpo.replace(",", ".")
+        return float(valor_limpo)
+    except ValueError as e:
+        logger.error(f"Erro ao converter preço '{valor}': {str(e)}", exc_info=True)
+        return 0.0  # Retorna 0.0 em caso de erro na conversão
+
+
+def book_id(title: str, category_name: str) -> int:
+    """
+    Gera o ID único do livro a partir do hash de título e categoria.
+    """
+    unique_str = f"{title}_{category_name}"
+    return int(hashlib.md5(unique_str.encode()).hexdigest(), 16) % (10**8)
+
+
+def build_book(title: str, price: float, rating_class: str, availability: str, image_src: str, href: str, category_name: str, base_url: str) -> Dict:
+    return {
+        "id": book_id(title, category_name),
+        "title": title,
+        "href": urljoin(base_url, href.replace("../../../", "catalogue/")),
+        "price": price,
+        "rating": RATING_MAP.get(rating_class, 0),
+        "availability": availability,
+        "category": category_name,
+        "image_url": base_url + image_src.replace("../", ""),
+    }
+
+
+def page_count_from(pager_text: str) -> int:
+    match = PAGE_COUNT_RE.search(pager_text) if pager_text else None
+    return int(match.group(1)) if match else 1
+
+
+class SoupExtractor:
+    """
+    Extração com BeautifulSoup e seletores CSS (implementação original, usada como fallback).
+    """
+
+    name = "bs4"
+
+    def parse(self, html: str, category_name: str, page: int, base_url: str) -> Tuple[List[Dict], int]:
+        soup = BeautifulSoup(html, "lxml")
+        books = []
+        for article in soup.select("ol.row li article.product_pod"):
+            try:
+                books.append(
+                    build_book(
+                        article.h3.a["title"],
+                        clean_price(article.select_one("p.price_color").text.strip()),
+                        article.p["class"][1],  # Extrai de 'star-rating X' -> 'X'
+                        article.select_one("p.availability").text.strip(),
+                        article.img["src"],
+                        article.h3.a["href"],
+                        category_name,
+                        base_url,
+                    )
+                )
+            except (AttributeError, KeyError, IndexError, TypeError) as e:
+                SCRAPER_ERRORS.inc(category=category_name, kind="parse")
+                logger.error(f"Erro ao raspar livro na categoria {category_name}, página {page}: {str(e)}", exc_info=True)
+
+        current = soup.select_one("ul.pager li.current")
+        return books, page_count_from(current.text if current else "")
+
+
+def _has_class(name: str) -> str:
+    return f'contains(concat(" ", normalize-space(@class), " "), " {name} ")'
+
+
+class XPathExtractor:
+    """
+    Extração com lxml e expressões XPath compiladas uma única vez: sem montar a árvore do BeautifulSoup
+    nem reavaliar seletores CSS a cada livro. Produz os mesmos registros que o SoupExtractor.
+    """
+
+    name = "lxml"
+
+    ARTICLES = etree.XPath(f"//ol[{_has_class('row')}]//li//article[{_has_class('product_pod')}]")
+    LINK = etree.XPath("(.//h3)[1]/descendant::a[1]")
+    PRICE = etree.XPath(f"(.//p[{_has_class('price_color')}])[1]")
+    RATING = etree.XPath("(.//p)[1]/@class")
+    AVAILABILITY = etree.XPath(f"(.//p[{_has_class('availability')}])[1]")
+    IMAGE = etree.XPath("(.//img)[1]/@src")
+    PAGER = etree.XPath(f"string((//ul[{_has_class('pager')}]//li[{_has_class('current')}])[1])")
+
+    def parse(self, html: str, category_name: str, page: int, base_url: str) -> Tuple[List[Dict], int]:
+        # etree.HTML usa o parser padrão do lxml, que é exclusivo de cada thread
+        root = etree.HTML(html)
+        if root is None:
+            raise ValueError("Documento HTML vazio")
+        books = []
+        for article in self.ARTICLES(root):
+            try:
+                link = self.LINK(article)[0]
+                books.append(
+                    build_book(
+                        link.attrib["title"],
+                        clean_price("".join(self.PRICE(article)[0].itertext()).strip()),
+                        self.RATING(article)[0].split()[1],
+                        "".join(self.AVAILABILITY(article)[0].itertext()).strip(),
+                        self.IMAGE(article)[0],
+                        link.attrib["href"],
+                        category_name,
+                        base_url,
+                    )
+                )
+            except (KeyError, IndexError) as e:
+                SCRAPER_ERRORS.inc(category=category_name, kind="parse")
+                logger.error(f"Erro ao raspar livro na categoria {category_name}, página {page}: {str(e)}", exc_info=True)
+        return books, page_count_from(self.PAGER(root))
+
+
+EXTRACTORS = {SoupExtractor.name: SoupExtractor, XPathExtractor.name: XPathExtractor}
+
+
+def create_extractor(name: str = None):
+    """
+    Cria o backend de extração pelo nome (lxml ou bs4); nomes desconhecidos usam o padrão.
+    """
+    name = name or DEFAULT_EXTRACTOR
+    if name not in EXTRACTORS:
+        logger.warning(f"Extrator '{name}' desconhecido, usando '{DEFAULT_EXTRACTOR}'")
+        name = DEFAULT_EXTRACTOR if DEFAULT_EXTRACTOR in EXTRACTORS else XPathExtractor.name
+    return EXTRACTORS[name]()
@@ -0,0 +1,121 @@
+import asyncio
+import time
+from typing import Optional
+
+from api.metrics import SCRAPER_CONCURRENCY
+
+
+class TokenBucket:
+    """
+    Token bucket para limitar a taxa de requisições: rate tokens por segundo, acumulando até burst.
+    Usado apenas dentro de um event loop (sem lock).
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        """
+        Esvazia o bucket de forma que o próximo token só fique disponível após seconds (ex.: Retry-After).
+        """
+        self._refill()
+        self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+
+
+class AdaptiveLimiter:
+    """
+    Limite de requisições para um host: token bucket (taxa máxima) e janela de concorrência adaptativa (AIMD).
+
+    Como no TCP, a janela começa em slow start (+1 por resposta saudável, dobrando a cada rodada) até o primeiro
+    sinal de congestionamento; depois cresce 1/limite por resposta (≈ +1 por rodada). Quando o servidor
+    responde 429/5xx, falha na conexão ou a latência suavizada passa de latency_tolerance vezes a menor latência
+    observada (mais latency_slack segundos), a janela é reduzida (pela metade em 429, 20% nos demais casos) no máximo uma vez por rodada,
+    para que as respostas de uma mesma rajada não a derrubem várias vezes.
+    """
+
+    def __init__(
+        self, host: str, rate: float, initial: int, minimum: int, maximum: int, latency_tolerance: float = 2.0, latency_slack: float = 0.05
+    ):
+        self.host = host
+        self.bucket = TokenBucket(rate, initial)
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_tolerance = latency_tolerance
+        self.latency_slack = latency_slack
+        self.in_flight = 0
+        self.smoothed_latency: Optional[float] = None
+        self.baseline_latency: Optional[float] = None
+        self._last_decrease = 0.0
+        self._slow_start = True
+        self._available = asyncio.Condition()
+        SCRAPER_CONCURRENCY.set(self.limit, host=host)
+
+    async def acquire(self):
+        async with self._available:
+            await self._available.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        try:
+            await self.bucket.acquire()
+        except BaseException:
+            await self.abandon()
+            raise
+
+    async def release(self, latency: float, overloaded: bool, throttled: bool = False):
+        """
+        Libera a vaga e ajusta a janela conforme o resultado da requisição.
+        overloaded indica erro do servidor ou de conexão; throttled, um 429 explícito.
+        """
+        async with self._available:
+            self.in_flight -= 1
+            self._adjust(latency, overloaded or throttled, throttled)
+            self._available.notify_all()
+
+    async def abandon(self):
+        """
+        Libera a vaga sem ajustar a janela: requisição cancelada ou encerrada por erro que não indica congestionamento.
+        """
+        async with self._available:
+            self.in_flight -= 1
+            self._available.notify_all()
+
+    def pause(self, seconds: float):
+        self.bucket.pause(seconds)
+
+    def _adjust(self, latency: float, overloaded: bool, throttled: bool):
+        if not overloaded:
+            self.smoothed_latency = latency if self.smoothed_latency is None else 0.8 * self.smoothed_latency + 0.2 * latency
+            if self.baseline_latency is None or self.smoothed_latency < self.baseline_latency:
+                self.baseline_latency = self.smoothed_latency
+
+        # A folga absoluta evita que respostas locais de poucos milissegundos, somadas ao tempo em que o event loop
+        # fica ocupado com a extração, sejam tomadas por congestionamento do servidor
+        slow = (
+            self.smoothed_latency is not None
+            and self.smoothed_latency > self.latency_tolerance * self.baseline_latency + self.latency_slack
+        )
+        if overloaded or slow:
+            now = time.monotonic()
+            if now - self._last_decrease >= (self.smoothed_latency or 0.0):
+                self.limit = max(self.minimum, self.limit * (0.5 if throttled else 0.8))
+                self._last_decrease = now
+                self._slow_start = False
+        else:
+            self.limit = min(self.maximum, self.limit + (1 if self._slow_start else 1 / self.limit))
+        SCRAPER_CONCURRENCY.set(round(self.limit, 2), host=self.host)
@@ -0,0 +1,80 @@
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import hashlib
+import threading
+import time
+
+# Quantidade máxima de tokens verificados mantidos em memória
+TOKEN_CACHE_SIZE = 1024
+
+
+class VerifiedTokenCache:
+    """
+    Cache LRU de tokens JWT já verificados, indexado pelo hash SHA-256 do token.
+    Evita repetir a decodificação (HMAC) e a montagem do TokenData a cada requisição autenticada.
+    Cada entrada expira junto com o token (exp) e é removida imediatamente quando o token é revogado.
+    """
+
+    def __init__(self, max_size: int = TOKEN_CACHE_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[Dict, str, float]]" = OrderedDict()
+        self._by_jti: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _digest(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[Tuple[Dict, str]]:
+        """
+        Retorna (usuário, jti) se o token estiver no cache e ainda não tiver expirado.
+        """
+        digest = self._digest(token)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None and entry[2] <= time.time():
+                self._remove(digest)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return entry[0], entry[1]
+
+    def put(self, token: str, user: Dict, jti: str, expires_at: float):
+        digest = self._digest(token)
+        with self._lock:
+            self._entries[digest] = (user, jti, float(expires_at))
+            self._entries.move_to_end(digest)
+            self._by_jti[jti] = digest
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, jti: str):
+        """
+        Remove do cache o token com o jti informado (chamado na revogação).
+        """
+        with self._lock:
+            digest = self._by_jti.get(jti)
+            if digest is not None:
+                self._remove(digest)
+
+    def _remove(self, digest: str):
+        user, jti, _ = self._entries.pop(digest)
+        if self._by_jti.get(jti) == digest:
+            del self._by_jti[jti]
+
+    def stats(self) -> Dict:
+        """
+        Retorna os contadores do cache para monitoramento.
+        """
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
@@ -0,0 +1,333 @@
+"""
+Benchmark de carga da API: mede vazão, latência (p50/p99) e memória de cada endpoint sobre
+catálogos sintéticos de 1k, 100k e 1M livros (benchmarks/catalog.py), e salva o resultado em JSON
+para comparação com uma execução anterior (baseline).
+
+A API roda no próprio processo (httpx + ASGITransport) ou, com --uvicorn, em um servidor uvicorn
+local iniciado para cada catálogo (a memória medida passa a ser a do servidor).
+
+Endpoints marcados como pesados (respostas com o catálogo inteiro ou grande parte dele) recebem
+--heavy-requests requisições sem concorrência. O cache de respostas da API fica ativo, como em produção;
+com --no-response-cache ele é desligado (RESPONSE_CACHE_SIZE=0) para medir o processamento de cada requisição.
+
+Uso:
+    python -m benchmarks.api_load --sizes 1k,100k,1M --output results.json
+    python -m benchmarks.api_load --sizes 100k --baseline results.json --fail-on-regression
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+os.makedirs("logs", exist_ok=True)
+
+import httpx  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from benchmarks.catalog import TITLE_WORDS, catalog_file, category_names  # noqa: E402
+
+
+class Endpoint(NamedTuple):
+    name: str
+    method: str
+    # Recebe o número da requisição e retorna (caminho, corpo JSON)
+    build: Callable[[int], Tuple[str, Optional[Dict]]]
+    heavy: bool = False
+
+
+def build_endpoints(ids: List[int]) -> List[Endpoint]:
+    """
+    Define as requisições de cada endpoint. Parâmetros variam entre requisições (ids, termos, faixas)
+    para que o resultado não dependa de uma única entrada do cache de respostas.
+    """
+    words = TITLE_WORDS
+    categories = category_names()
+
+    def get(path: Callable[[int], str]):
+        return lambda number: (path(number), None)
+
+    return [
+        Endpoint("health", "GET", get(lambda n: "/api/v1/health")),
+        Endpoint("books_page", "GET", get(lambda n: f"/api/v1/books?limit=100&cursor={ids[n % len(ids)]}")),
+        Endpoint("books_all", "GET", get(lambda n: "/api/v1/books"), heavy=True),
+        Endpoint("books_stream", "GET", get(lambda n: "/api/v1/books?stream=true"), heavy=True),
+        Endpoint("book_by_id", "GET", get(lambda n: f"/api/v1/books/{ids[n % len(ids)]}")),
+        Endpoint("books_batch", "POST", lambda n: ("/api/v1/books/batch", {"ids": [ids[(n + k) % len(ids)] for k in range(100)]})),
+        Endpoint(
+            "search_title",
+            "GET",
+            get(lambda n: f"/api/v1/books/search?title={words[n % len(words)]}+{words[(n // len(words)) % len(words)]}"),
+        ),
+        Endpoint(
+            "search_prefix_category",
+            "GET",
+            get(lambda n: f"/api/v1/books/search?title={words[n % len(words)]}&category={categories[n % len(categories)]}&match=prefix"),
+        ),
+        Endpoint("search_ranked", "GET", get(lambda n: f"/api/v1/books/search?title={words[n % len(words)][:4]}&rank=true"), heavy=True),
+        Endpoint("categories", "GET", get(lambda n: "/api/v1/categories")),
+        Endpoint("stats_overview", "GET", get(lambda n: "/api/v1/stats/overview")),
+        Endpoint("stats_categories", "GET", get(lambda n: "/api/v1/stats/categories")),
+        Endpoint("stats_dashboard", "GET", get(lambda n: "/api/v1/stats/dashboard?top=5")),
+        Endpoint("top_rated", "GET", get(lambda n: "/api/v1/books/top-rated"), heavy=True),
+        Endpoint(
+            "price_range",
+            "GET",
+            get(lambda n: f"/api/v1/books/price-range?min_price={10 + n % 40}&max_price={10.5 + n % 40}&sort=asc&limit=100"),
+        ),
+        Endpoint(
+            "books_query",
+            "GET",
+            get(
+                lambda n: f"/api/v1/books/query?category={categories[n % len(categories)]}&category={categories[(n + 1) % len(categories)]}"
+                f"&rating=4&rating=5&availability=In stock&min_price={10 + n % 30}&max_price={30 + n % 30}&sort=-price&limit=50"
+            ),
+        ),
+        Endpoint("ml_features", "GET", get(lambda n: "/api/v1/ml/features"), heavy=True),
+        Endpoint("ml_features_npz", "GET", get(lambda n: "/api/v1/ml/features?format=npz")),
+        Endpoint("ml_features_arrow", "GET", get(lambda n: "/api/v1/ml/features?format=arrow")),
+        Endpoint("ml_features_ndjson", "GET", get(lambda n: "/api/v1/ml/features?format=ndjson"), heavy=True),
+        Endpoint("ml_training_page", "GET", get(lambda n: f"/api/v1/ml/training-data?limit=100&cursor={ids[n % len(ids)]}")),
+        Endpoint("metrics", "GET", get(lambda n: "/metrics")),
+    ]
+
+
+def parse_size(value: str) -> int:
+    value = value.strip().lower()
+    multipliers = {"k": 1000, "m": 1000000}
+    if value[-1] in multipliers:
+        return int(float(value[:-1]) * multipliers[value[-1]])
+    return int(value)
+
+
+def process_memory(pid: int) -> Dict[str, float]:
+    """
+    Retorna a memória residente atual e o pico (MiB) do processo, lidos de /proc (Linux).
+    """
+    memory = {"rss_mb": None, "peak_rss_mb": None}
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    memory["rss_mb"] = round(int(line.split()[1]) / 1024, 1)
+                elif line.startswith("VmHWM:"):
+                    memory["peak_rss_mb"] = round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        import resource
+
+        memory["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return memory
+
+
+async def run_endpoint(client: httpx.AsyncClient, endpoint: Endpoint, requests: int, concurrency: int) -> Dict:
+    """
+    Executa requests requisições com até concurrency em paralelo e resume latências, vazão e erros.
+    """
+    latencies: List[float] = []
+    errors = 0
+    received = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors, received
+        for number in counter:
+            path, body = endpoint.build(number)
+            start = time.perf_counter()
+            try:
+                response = await client.request(endpoint.method, path, json=body)
+                received += len(response.content)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    # Aquecimento: primeira execução da rota (imports, caches de agregados) fora da medição
+    path, body = endpoint.build(0)
+    await client.request(endpoint.method, path, json=body)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    values = np.array(latencies) * 1000
+    return {
+        "name": endpoint.name,
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "req_per_s": round(requests / elapsed, 1),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "mean_ms": round(float(values.mean()), 3),
+        "max_ms": round(float(values.max()), 3),
+        "bytes_per_request": received // requests,
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_uvicorn(data_file: str, timeout: float = 600) -> Tuple[subprocess.Popen, str, float]:
+    """
+    Inicia um servidor uvicorn local com o catálogo informado e aguarda /api/v1/health responder.
+    Retorna o processo, a URL base e o tempo até o servidor ficar pronto.
+    """
+    port = free_port()
+    env = {**os.environ, "DATA_FILE": data_file}
+    command = [sys.executable, "-m", "uvicorn", "api.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"]
+    start = time.perf_counter()
+    process = subprocess.Popen(command, env=env)
+    base_url = f"http://127.0.0.1:{port}"
+    while time.perf_counter() - start < timeout:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn encerrou com código {process.returncode}")
+        try:
+            if httpx.get(f"{base_url}/api/v1/health", timeout=1).status_code == 200:
+                return process, base_url, time.perf_counter() - start
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("uvicorn não ficou pronto a tempo")
+
+
+async def bench_catalog(rows: int, data_file: str, args) -> Dict:
+    ids = pd.read_csv(data_file, usecols=["id"])["id"].sample(min(rows, 1000), random_state=args.seed).tolist()
+    endpoints = [endpoint for endpoint in build_endpoints(ids) if not args.endpoints or endpoint.name in args.endpoints]
+    process = None
+
+    if args.uvicorn:
+        process, base_url, load_seconds = start_uvicorn(data_file)
+        pid = process.pid
+        client = httpx.AsyncClient(base_url=base_url, timeout=600, limits=httpx.Limits(max_connections=args.concurrency))
+    else:
+        import api.dependencies as dependencies
+        from api.main import app
+
+        dependencies.DATA_FILE = data_file
+        gc.collect()
+        start = time.perf_counter()
+        dependencies.load_books_data()
+        load_seconds = time.perf_counter() - start
+        pid = os.getpid()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=600)
+
+    catalog = {"rows": rows, "load_seconds": round(load_seconds, 3), **process_memory(pid), "endpoints": []}
+    try:
+        async with client:
+            for endpoint in endpoints:
+                if endpoint.heavy:
+                    result = await run_endpoint(client, endpoint, args.heavy_requests, 1)
+                else:
+                    result = await run_endpoint(client, endpoint, args.requests, args.concurrency)
+                result.update(process_memory(pid))
+                catalog["endpoints"].append(result)
+                print(
+                    f"{rows:>8} {result['name']:<24} {result['req_per_s']:>9.1f} req/s  p50 {result['p50_ms']:>9.2f} ms  "
+                    f"p99 {result['p99_ms']:>9.2f} ms  rss {result['rss_mb']} MiB  erros {result['errors']}"
+                )
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+    return catalog
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """
+    Compara vazão e p99 com a baseline, por (tamanho do catálogo, endpoint).
+    Retorna a lista de regressões acima de threshold (fração, ex.: 0.1 = 10%).
+    """
+    previous = {(catalog["rows"], endpoint["name"]): endpoint for catalog in baseline["catalogs"] for endpoint in catalog["endpoints"]}
+    regressions = []
+    print(f"\nComparação com a baseline ({baseline['meta'].get('git_commit')}), limite {threshold:.0%}:")
+    if baseline["meta"].get("mode") != results["meta"]["mode"] or baseline["meta"].get("cpu_count") != results["meta"]["cpu_count"]:
+        print("Atenção: a baseline foi medida em outro modo ou máquina; a comparação não é equivalente.")
+    for catalog in results["catalogs"]:
+        for endpoint in catalog["endpoints"]:
+            before = previous.get((catalog["rows"], endpoint["name"]))
+            if before is None:
+                continue
+            throughput = endpoint["req_per_s"] / before["req_per_s"] - 1
+            p99 = endpoint["p99_ms"] / before["p99_ms"] - 1
+            regressed = throughput < -threshold or p99 > threshold
+            marker = "REGRESSÃO" if regressed else ""
+            print(f"{catalog['rows']:>8} {endpoint['name']:<24} vazão {throughput:>+8.1%}  p99 {p99:>+8.1%}  {marker}")
+            if regressed:
+                regressions.append(f"{catalog['rows']}:{endpoint['name']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de carga da API por endpoint e tamanho de catálogo")
+    parser.add_argument("--sizes", default="1k,100k,1M", help="Tamanhos dos catálogos, separados por vírgula (ex.: 1k,100k,1M)")
+    parser.add_argument("--requests", type=int, default=200, help="Requisições por endpoint")
+    parser.add_argument("--heavy-requests", type=int, default=3, help="Requisições por endpoint pesado")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--endpoints", nargs="*", help="Executa apenas os endpoints informados (pelo nome)")
+    parser.add_argument("--uvicorn", action="store_true", help="Executa contra um servidor uvicorn local em vez de no processo")
+    parser.add_argument("--no-response-cache", action="store_true", help="Desliga o cache de respostas da API")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "books-bench"), help="Onde os catálogos gerados são guardados")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Arquivo JSON para salvar os resultados")
+    parser.add_argument("--baseline", help="Resultado anterior (JSON) para comparação")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Variação tolerada na comparação (0.1 = 10%%)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Termina com código 1 se houver regressão")
+    args = parser.parse_args()
+
+    if args.no_response_cache:
+        os.environ["RESPONSE_CACHE_SIZE"] = "0"
+
+    sizes = [parse_size(size) for size in args.sizes.split(",")]
+    files = {rows: catalog_file(rows, args.data_dir, args.seed) for rows in sizes}
+    # No modo em processo, a API carrega o arquivo de DATA_FILE ao ser importada
+    os.environ["DATA_FILE"] = files[sizes[0]]
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "mode": "uvicorn" if args.uvicorn else "in-process",
+            "params": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        },
+        "catalogs": [],
+    }
+    for rows in sizes:
+        results["catalogs"].append(asyncio.run(bench_catalog(rows, files[rows], args)))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions and args.fail_on_regression:
+            print(f"Regressões: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark de rajada: dispara requisições pesadas simultâneas contra um servidor uvicorn local e, em paralelo,
+sonda /api/v1/health em intervalos fixos. Mede quanto a rajada atrasa as requisições leves (latência do /health)
+e como as pesadas terminam (200 ou 503 com Retry-After) e em quanto tempo.
+
+O cache de respostas da API é desligado para que cada requisição pesada refaça a consulta e a serialização.
+
+Uso: python -m benchmarks.burst --rows 100k --burst 32 --path "/api/v1/books?limit=1000"
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+from collections import Counter
+from typing import Dict, List
+
+os.environ.setdefault("RESPONSE_CACHE_SIZE", "0")
+
+import httpx  # noqa: E402
+
+from benchmarks.api_load import parse_size, start_uvicorn  # noqa: E402
+from benchmarks.catalog import catalog_file  # noqa: E402
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"p50": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(values)
+    return {
+        "p50": round(statistics.median(ordered) * 1000, 2),
+        "p99": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 2),
+        "max": round(ordered[-1] * 1000, 2),
+    }
+
+
+async def heavy_request(client: httpx.AsyncClient, path: str, results: List):
+    start = time.perf_counter()
+    response = await client.get(path)
+    await response.aread()
+    results.append((response.status_code, time.perf_counter() - start, response.headers.get("retry-after")))
+
+
+async def probe_health(client: httpx.AsyncClient, stop: asyncio.Event, interval: float, latencies: List[float]):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/api/v1/health")
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+
+
+async def run_burst(base_url: str, path: str, burst: int, waves: int, interval: float) -> Dict:
+    limits = httpx.Limits(max_connections=burst + 4, max_keepalive_connections=burst + 4)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        await client.get(path)  # aquece o caminho (índices, caches de versão)
+        baseline: List[float] = []
+        stop = asyncio.Event()
+        probe = asyncio.create_task(probe_health(client, stop, interval, baseline))
+        await asyncio.sleep(1.0)
+        stop.set()
+        await probe
+
+        health: List[float] = []
+        results: List = []
+        stop = asyncio.Event()
+        probe = asyncio.create_task(probe_health(client, stop, interval, health))
+        start = time.perf_counter()
+        for _ in range(waves):
+            await asyncio.gather(*(heavy_request(client, path, results) for _ in range(burst)))
+        wall = time.perf_counter() - start
+        stop.set()
+        await probe
+
+    statuses = Counter(status for status, _, _ in results)
+    return {
+        "seconds": round(wall, 3),
+        "statuses": dict(statuses),
+        "heavy_ok_ms": percentiles([elapsed for status, elapsed, _ in results if status == 200]),
+        "heavy_rejected_ms": percentiles([elapsed for status, elapsed, _ in results if status == 503]),
+        "retry_after": sorted({retry for status, _, retry in results if status == 503}),
+        "health_idle_ms": percentiles(baseline),
+        "health_burst_ms": percentiles(health),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latência do /health e das rotas pesadas durante uma rajada")
+    parser.add_argument("--rows", default="100k", help="Tamanho do catálogo (ex.: 100k, 1M)")
+    parser.add_argument("--path", default="/api/v1/books?limit=1000", help="Rota pesada disparada na rajada")
+    parser.add_argument("--burst", type=int, default=32, help="Requisições pesadas simultâneas por onda")
+    parser.add_argument("--waves", type=int, default=3)
+    parser.add_argument("--interval", type=float, default=0.02, help="Intervalo entre sondagens do /health, em segundos")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "books-bench"), help="Onde os catálogos gerados são guardados")
+    parser.add_argument("--output", help="Arquivo JSON para salvar os resultados")
+    args = parser.parse_args()
+
+    data_file = catalog_file(parse_size(args.rows), args.data_dir)
+    process, base_url, _ = start_uvicorn(data_file)
+    try:
+        result = asyncio.run(run_burst(base_url, args.path, args.burst, args.waves, args.interval))
+    finally:
+        process.terminate()
+        process.wait()
+
+    print(f"Rajada: {args.waves} x {args.burst} requisições em {args.path} ({args.rows} livros), {result['seconds']:.2f}s")
+    print(f"  status: {result['statuses']}  Retry-After: {result['retry_after']}")
+    for key in ("heavy_ok_ms", "heavy_rejected_ms", "health_idle_ms", "health_burst_ms"):
+        values = result[key]
+        print(f"  {key:<18} p50 {values['p50']:>9.2f} ms  p99 {values['p99']:>9.2f} ms  max {values['max']:>9.2f} ms")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"params": vars(args), "result": result}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Gerador de catálogos sintéticos no esquema do data/books.csv, para benchmarks com 1k, 100k ou 1M livros.
+
+O conteúdo é determinístico para um mesmo (rows, seed): títulos combinam palavras de um vocabulário fixo,
+categorias seguem uma distribuição desigual (como no site original) e os ids são únicos.
+
+Uso isolado: python -m benchmarks.catalog --rows 100000 --output /tmp/books-100k.csv
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from api.dataset import FIELDNAMES
+
+# Vocabulário dos títulos gerados; os benchmarks de busca usam estas palavras como termos
+TITLE_WORDS = [
+    "light", "house", "river", "secret", "garden", "night", "shadow", "winter", "storm", "city",
+    "history", "love", "war", "dream", "silent", "golden", "lost", "empire", "ocean", "mountain",
+    "journey", "kingdom", "forest", "letters", "stranger", "machine", "island", "fire", "stone", "glass",
+]
+
+AVAILABILITY = ["In stock", "Out of stock"]
+
+
+def category_names(count: int = 50):
+    return [f"Category {number:02d}" for number in range(count)]
+
+
+def generate_catalog(rows: int, seed: int = 42, categories: int = 50) -> pd.DataFrame:
+    """
+    Gera um DataFrame com rows livros nas colunas de FIELDNAMES.
+    """
+    rng = np.random.default_rng(seed)
+    ids = rng.permutation(rows).astype(np.int64) * 97 + 1
+
+    words = np.array(TITLE_WORDS, dtype=object)
+    titles = (
+        pd.Series(words[rng.integers(0, len(words), rows)]).str.capitalize()
+        + " "
+        + pd.Series(words[rng.integers(0, len(words), rows)])
+        + " "
+        + pd.Series(words[rng.integers(0, len(words), rows)])
+        + " "
+        + pd.Series(np.arange(rows)).astype(str)
+    )
+
+    weights = 1.0 / np.arange(1, categories + 1)
+    names = np.array(category_names(categories), dtype=object)
+    category = names[rng.choice(categories, rows, p=weights / weights.sum())]
+
+    id_text = pd.Series(ids).astype(str)
+    df = pd.DataFrame(
+        {
+            "id": ids,
+            "title": titles,
+            "href": "https://books.toscrape.com/catalogue/book_" + id_text + "/index.html",
+            "price": np.round(rng.uniform(10, 60, rows), 2),
+            "rating": rng.integers(1, 6, rows),
+            "availability": np.array(AVAILABILITY, dtype=object)[(rng.random(rows) < 0.05).astype(int)],
+            "category": category,
+            "image_url": "https://books.toscrape.com/media/cache/" + id_text + ".jpg",
+        }
+    )
+    return df[FIELDNAMES]
+
+
+def catalog_file(rows: int, data_dir: str, seed: int = 42) -> str:
+    """
+    Retorna o caminho do CSV do catálogo, gerando-o apenas se ainda não existir em data_dir.
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"books-{rows}-seed{seed}.csv")
+    if not os.path.exists(path):
+        generate_catalog(rows, seed).to_csv(path, index=False)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera um catálogo sintético no esquema do books.csv")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args()
+
+    generate_catalog(args.rows, args.seed).to_csv(args.output, index=False)
+    print(f"{args.rows} livros gravados em {args.output}")
@@ -0,0 +1,117 @@
+"""
+Verificação de paridade e micro-benchmark dos backends de extração das páginas de categoria
+(api/scrapper/pageExtractor.py): XPathExtractor (lxml, XPath compilado) e SoupExtractor (BeautifulSoup).
+
+A paridade é conferida em páginas da réplica local (benchmarks/replica.py) e em páginas com casos de borda
+(livro sem preço, classes extras, entidades HTML, comentários, página sem paginador). Qualquer diferença
+nos registros ou no total de páginas encerra o script com código 1.
+
+Uso: python -m benchmarks.extraction --repeat 200
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+os.makedirs("logs", exist_ok=True)
+
+import api.scrapper.bookScraper  # noqa: E402,F401  (configura os arquivos de log do scraper)
+from api.scrapper.pageExtractor import SoupExtractor, XPathExtractor  # noqa: E402
+from benchmarks.replica import build_site, default_category_sizes  # noqa: E402
+
+BASE_URL = "https://books.toscrape.com/"
+
+ARTICLE = (
+    '<li class="col-xs-6"><article class="{article_class}">'
+    '<div class="image_container"><a href="../../../{slug}/index.html"><img src="../../../../media/cache/{slug}.jpg" alt="x" class="thumbnail"></a></div>'
+    '<p class="star-rating {rating}"><i class="icon-star"></i></p>'
+    '<h3><a href="../../../{slug}/index.html" title="{title}">{title}</a></h3>'
+    '<div class="product_price">{price}<p class="instock availability">\n    <i class="icon-ok"></i>\n    {availability}\n</p></div>'
+    "</article></li>"
+)
+
+
+def article(title, slug, rating="Three", price='<p class="price_color">£51.77</p>', availability="In stock", article_class="product_pod"):
+    return ARTICLE.format(title=title, slug=slug, rating=rating, price=price, availability=availability, article_class=article_class)
+
+
+def edge_pages():
+    """
+    Páginas com variações de estrutura que os dois backends devem tratar da mesma forma.
+    """
+    items = [
+        article("Plain title", "plain_1"),
+        article("Tom &amp; Jerry &quot;Quoted&quot; &lt;Title&gt;", "entities_2", rating="Five"),
+        article("No price", "no-price_3", price=""),
+        article("Comma price", "comma_4", price='<p class="price_color">£12,50</p>'),
+        article("Extra classes", "extra_5", article_class="product_pod featured"),
+        article("Comment in price", "comment_6", price='<p class="price_color"><!-- promo -->£9.99</p>'),
+        article("Unknown rating", "rating_7", rating="Zero"),
+        article("Out of stock", "oos_8", availability="Out of stock"),
+    ]
+    with_pager = (
+        '<html><body><section><ol class="row">' + "".join(items) + "</ol>"
+        '<ul class="pager"><li class="current">\n    Page 2 of 7\n</li></ul></section></body></html>'
+    )
+    without_pager = '<html><body><ol class="row">' + items[0] + "</ol></body></html>"
+    empty = "<html><body><p>Nenhum livro</p></body></html>"
+    return {"edge/with-pager": with_pager, "edge/without-pager": without_pager, "edge/empty": empty}
+
+
+def fixture_pages(books: int):
+    pages = {path: body.decode() for path, body in build_site(default_category_sizes(50, books)).items() if "/category/" in path}
+    pages.update(edge_pages())
+    return pages
+
+
+def check_parity(pages) -> list:
+    fast, reference = XPathExtractor(), SoupExtractor()
+    mismatches = []
+    for path, html in pages.items():
+        expected = reference.parse(html, "Category", 1, BASE_URL)
+        result = fast.parse(html, "Category", 1, BASE_URL)
+        if result != expected:
+            mismatches.append(path)
+            print(f"Diferença em {path}:\n  bs4:  {expected}\n  lxml: {result}")
+    return mismatches
+
+
+def per_page_time(extractor, pages, repeat: int) -> float:
+    documents = list(pages.values())
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for html in documents:
+            extractor.parse(html, "Category", 1, BASE_URL)
+    return (time.perf_counter() - start) / (repeat * len(documents))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Paridade e micro-benchmark dos extratores de páginas de categoria")
+    parser.add_argument("--books", type=int, default=1000, help="Livros na réplica usada como fixture")
+    parser.add_argument("--repeat", type=int, default=50, help="Repetições de cada página no benchmark")
+    parser.add_argument("--output", help="Arquivo JSON para salvar os resultados")
+    args = parser.parse_args()
+
+    pages = fixture_pages(args.books)
+    mismatches = check_parity(pages)
+    print(f"Paridade: {len(pages) - len(mismatches)}/{len(pages)} páginas idênticas")
+
+    # O benchmark usa apenas páginas completas (20 livros), como as do site
+    full_pages = {path: html for path, html in pages.items() if html.count('class="product_pod"') == 20}
+    timings = {name: per_page_time(extractor, full_pages, args.repeat) for name, extractor in (("bs4", SoupExtractor()), ("lxml", XPathExtractor()))}
+    for name, seconds in timings.items():
+        print(f"{name:<5} {seconds * 1000:>8.3f} ms/página  {1 / seconds:>8.1f} páginas/s")
+    print(f"Speedup lxml vs bs4: {timings['bs4'] / timings['lxml']:.1f}x")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"params": vars(args), "mismatches": mismatches, "ms_per_page": {k: v * 1000 for k, v in timings.items()}}, f, indent=2)
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark do custo do log de acesso: compara a escrita síncrona em arquivo (FileHandler direto no logger,
+como antes) com o pipeline por fila (QueueHandler + thread de escrita), com e sem amostragem.
+
+Mede duas coisas:
+- o tempo de uma chamada de log vista pela thread que loga, com várias threads logando ao mesmo tempo;
+- requisições por segundo de um endpoint leve (/api/v1/books/{id}) atendido pelo TestClient.
+
+Uso: python -m benchmarks.logging_overhead --calls 20000 --threads 10 --requests 2000
+"""
+
+import argparse
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+os.makedirs("logs", exist_ok=True)
+
+from api import log_pipeline  # noqa: E402
+from api.log_pipeline import JsonFormatter, setup_queue_logging  # noqa: E402
+
+FIELDS = {"client_ip": "127.0.0.1", "method": "GET", "path": "/api/v1/books/1", "query": None, "status": 200, "bytes": 230, "user_agent": "bench", "duration_ms": 0.5}
+
+
+def configure(logger: logging.Logger, mode: str, path: str):
+    """
+    Troca os handlers do logger: "sync" grava direto no arquivo; "queue" usa o pipeline por fila.
+    """
+    pipeline = log_pipeline._pipelines.pop(logger.name, None)
+    if pipeline is not None:
+        pipeline.stop()
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+    handler = logging.FileHandler(path)
+    handler.setFormatter(JsonFormatter())
+    if mode == "sync":
+        logger.addHandler(handler)
+    else:
+        setup_queue_logging(logger, [handler])
+
+
+def flush(logger: logging.Logger):
+    pipeline = log_pipeline._pipelines.get(logger.name)
+    if pipeline is not None:
+        pipeline.listener.stop()
+        pipeline.listener.start()
+
+
+def call_latency(logger: logging.Logger, calls: int, threads: int) -> dict:
+    """
+    Executa calls chamadas de log divididas entre threads (com a mesma decisão de amostragem do middleware)
+    e mede a duração de cada chamada.
+    """
+    durations = []
+    lock = threading.Lock()
+
+    def worker(count: int):
+        local = []
+        for _ in range(count):
+            start = time.perf_counter()
+            if log_pipeline.should_log_access(200):
+                logger.info("%s %s %s", "GET", "/api/v1/books/1", 200, extra={"fields": FIELDS})
+            local.append(time.perf_counter() - start)
+        with lock:
+            durations.extend(local)
+
+    workers = [threading.Thread(target=worker, args=(calls // threads,)) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    flush(logger)
+    durations.sort()
+    return {
+        "calls_per_s": round(len(durations) / elapsed),
+        "p50_us": round(durations[len(durations) // 2] * 1e6, 1),
+        "p99_us": round(durations[int(len(durations) * 0.99)] * 1e6, 1),
+    }
+
+
+def request_rate(client, requests: int) -> float:
+    start = time.perf_counter()
+    for number in range(requests):
+        client.get(f"/api/v1/books/{number % 50 + 1}")
+    return round(requests / (time.perf_counter() - start), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do custo do log de acesso")
+    parser.add_argument("--calls", type=int, default=20000, help="Chamadas de log no teste de latência")
+    parser.add_argument("--threads", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=2000, help="Requisições no teste ponta a ponta")
+    parser.add_argument("--output", help="Arquivo JSON para salvar os resultados")
+    args = parser.parse_args()
+
+    from fastapi.testclient import TestClient
+    from api.main import app, logger_http
+
+    client = TestClient(app)
+    modes = [("sync", 1.0), ("queue", 1.0), ("queue", 0.1)]
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode, sample_rate in modes:
+            path = os.path.join(tmp, f"http-{mode}-{sample_rate}.log")
+            configure(logger_http, mode, path)
+            log_pipeline.ACCESS_LOG_SAMPLE_RATE = sample_rate
+            latency = call_latency(logger_http, args.calls, args.threads)
+            client.get("/api/v1/books/1")
+            rate = request_rate(client, args.requests)
+            flush(logger_http)
+            results.append({"mode": mode, "sample_rate": sample_rate, **latency, "req_per_s": rate})
+        configure(logger_http, "queue", "logs/http.log")
+
+    print(f"{'modo':<7} {'amostra':>7} {'chamadas/s':>11} {'p50 (µs)':>9} {'p99 (µs)':>9} {'req/s':>8}")
+    for result in results:
+        print(
+            f"{result['mode']:<7} {result['sample_rate']:>7.2f} {result['calls_per_s']:>11} "
+            f"{result['p50_us']:>9} {result['p99_us']:>9} {result['req_per_s']:>8}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"params": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
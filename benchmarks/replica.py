@@ -0,0 +1,210 @@
+"""
+Réplica local do site https://books.toscrape.com/ para benchmarks do scraper.
+
+Gera páginas HTML com a mesma estrutura usada pelo BookScraper (lista de categorias,
+páginas de categoria com article.product_pod e paginador "Page X of N") e as serve
+por um servidor HTTP local, com latência configurável por requisição (fixa + variação aleatória),
+taxa de erros injetados (503 nas páginas de categoria) e suporte a requisições condicionais (ETag / If-None-Match).
+
+Uso isolado: python -m benchmarks.replica --port 8080 --latency 0.05 --jitter 0.02 --error-rate 0.01
+"""
+
+import argparse
+import hashlib
+import html
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+# Livros por página de categoria, como no site original
+PAGE_SIZE = 20
+
+RATINGS = ["One", "Two", "Three", "Four", "Five"]
+
+
+def default_category_sizes(categories: int = 50, books: int = 1000) -> List[int]:
+    """
+    Distribui os livros entre as categorias de forma desigual, como no site original:
+    poucas categorias grandes (ex.: Default, Nonfiction) e muitas pequenas.
+    """
+    weights = [1.0 / (rank + 1) for rank in range(categories)]
+    total = sum(weights)
+    sizes = [max(1, int(books * weight / total)) for weight in weights]
+    sizes[0] += books - sum(sizes)
+    return sizes
+
+
+def _slug(name: str) -> str:
+    return name.lower().replace(" ", "-")
+
+
+def build_site(sizes: List[int], page_size: int = PAGE_SIZE) -> Dict[str, bytes]:
+    """
+    Monta o conteúdo de todas as páginas do site: {caminho: html}.
+    page_size define quantos livros cada página de categoria traz (e, portanto, quantas páginas há).
+    """
+    pages: Dict[str, bytes] = {}
+    categories = [(f"Category {number:02d}", f"catalogue/category/books/{_slug(f'category {number:02d}')}_{number + 2}/") for number in range(len(sizes))]
+
+    links = "\n".join(f'<li><a href="{path}index.html">\n    {name}\n</a></li>' for name, path in categories)
+    pages["/"] = pages["/index.html"] = (
+        '<html><body><div class="side_categories"><ul class="nav nav-list"><li>'
+        '<a href="catalogue/category/books_1/index.html">Books</a>'
+        f"<ul>{links}</ul></li></ul></div></body></html>"
+    ).encode()
+
+    book_number = 0
+    for (name, path), size in zip(categories, sizes):
+        page_count = max(1, -(-size // page_size))
+        for page in range(1, page_count + 1):
+            articles = []
+            for _ in range(min(page_size, size - (page - 1) * page_size)):
+                book_number += 1
+                title = html.escape(f"Book {book_number} of {name}", quote=True)
+                articles.append(
+                    '<li class="col-xs-6 col-sm-4 col-md-3 col-lg-3"><article class="product_pod">'
+                    f'<div class="image_container"><a href="../../../book-{book_number}_{book_number}/index.html">'
+                    f'<img src="../../../../media/cache/{book_number % 97:02x}/{book_number:08x}.jpg" alt="{title}" class="thumbnail"></a></div>'
+                    f'<p class="star-rating {RATINGS[book_number % 5]}"><i class="icon-star"></i></p>'
+                    f'<h3><a href="../../../book-{book_number}_{book_number}/index.html" title="{title}">{title[:20]}...</a></h3>'
+                    f'<div class="product_price"><p class="price_color">£{10 + (book_number * 7919) % 5000 / 100:.2f}</p>'
+                    '<p class="instock availability"><i class="icon-ok"></i>\n    In stock\n</p></div>'
+                    "</article></li>"
+                )
+            pager = ""
+            if page_count > 1:
+                pager = f'<ul class="pager"><li class="current">\n    Page {page} of {page_count}\n</li>'
+                if page < page_count:
+                    pager += f'<li class="next"><a href="page-{page + 1}.html">next</a></li>'
+                pager += "</ul>"
+            body = f'<html><body><section><ol class="row">{"".join(articles)}</ol><div>{pager}</div></section></body></html>'
+            file_name = "index.html" if page == 1 else f"page-{page}.html"
+            pages[f"/{path}{file_name}"] = body.encode()
+    return pages
+
+
+class _Server(ThreadingHTTPServer):
+    # Fila maior que o padrão (5) para suportar rajadas de conexões concorrentes do scraper
+    request_queue_size = 256
+    daemon_threads = True
+
+
+class ReplicaServer:
+    """
+    Servidor HTTP local que serve as páginas geradas por build_site, em uma thread própria.
+    Pode ser usado como context manager; base_url aponta para a raiz do site.
+    Cada requisição espera latency + uniforme(0, jitter) segundos; páginas de categoria respondem 503
+    com probabilidade error_rate (sorteio reprodutível pela seed).
+    """
+
+    def __init__(
+        self,
+        sizes: List[int] = None,
+        latency: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        page_size: int = PAGE_SIZE,
+        seed: int = 0,
+    ):
+        self.pages = build_site(sizes or default_category_sizes(), page_size)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests = 0
+        self.bytes_sent = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        replica = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                path = self.path.split("?")[0]
+                with replica._lock:
+                    delay = replica.latency + (replica._random.uniform(0, replica.jitter) if replica.jitter else 0.0)
+                    failed = "/category/" in path and replica.error_rate > 0 and replica._random.random() < replica.error_rate
+                if delay:
+                    time.sleep(delay)
+                body = replica.pages.get(path)
+                status = 200 if body is not None else 404
+                etag = f'"{hashlib.md5(body).hexdigest()}"' if body is not None else None
+                if failed:
+                    status, body, etag = 503, b"<html><body>Service unavailable</body></html>", None
+                elif etag and self.headers.get("If-None-Match") == etag:
+                    status, body = 304, b""
+                body = body if body is not None else b"<html><body>Not found</body></html>"
+                with replica._lock:
+                    replica.requests += 1
+                    replica.bytes_sent += len(body)
+                    replica.errors += failed
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                if etag:
+                    self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = _Server((host, port), Handler)
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    @property
+    def total_books(self) -> int:
+        return sum(page.count(b'class="product_pod"') for path, page in self.pages.items() if "/category/" in path)
+
+    def start(self) -> "ReplicaServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "ReplicaServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Réplica local do books.toscrape.com")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--books", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.0, help="Latência por requisição, em segundos")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Variação aleatória somada à latência, em segundos")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração das páginas de categoria respondidas com 503")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE, help="Livros por página de categoria")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = ReplicaServer(
+        default_category_sizes(args.categories, args.books),
+        args.latency,
+        port=args.port,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        page_size=args.page_size,
+        seed=args.seed,
+    )
+    print(f"Réplica servindo {server.total_books} livros em {server.base_url}")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        server.server.server_close()
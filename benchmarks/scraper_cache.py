@@ -0,0 +1,59 @@
+"""
+Benchmark do re-scraping incremental: executa um scraping completo com o cache de páginas vazio
+e, em seguida, um re-scraping sem alterações no site, comparando tempo, requisições e bytes transferidos.
+
+Uso: python -m benchmarks.scraper_cache --latency 0.05 --books 1000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+os.makedirs("logs", exist_ok=True)
+
+from api.scrapper.bookScraper import BookScraper  # noqa: E402
+from api.scrapper.httpCache import PageCache  # noqa: E402
+from benchmarks.replica import ReplicaServer, default_category_sizes  # noqa: E402
+
+
+def run(replica: ReplicaServer, cache_file: str, respect_validators: bool = True):
+    requests_before, bytes_before = replica.requests, replica.bytes_sent
+    scraper = BookScraper(base_url=replica.base_url, cache=PageCache(cache_file))
+    if not respect_validators:
+        scraper.cache.conditional_headers = lambda url: {}
+    start = time.perf_counter()
+    books = scraper.scrape_all()
+    return {
+        "seconds": round(time.perf_counter() - start, 3),
+        "books": len(books),
+        "requests": replica.requests - requests_before,
+        "bytes": replica.bytes_sent - bytes_before,
+        **scraper.cache_stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do re-scraping incremental com cache de páginas")
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--books", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.05, help="Latência por requisição na réplica, em segundos")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, ReplicaServer(default_category_sizes(args.categories, args.books), args.latency) as replica:
+        cache_file = os.path.join(tmp, "cache.sqlite")
+        results = {
+            "completo (cache vazio)": run(replica, cache_file),
+            "re-scraping (304)": run(replica, cache_file),
+            "re-scraping (sem validadores, hash)": run(replica, cache_file, respect_validators=False),
+        }
+
+    for label, result in results.items():
+        print(
+            f"{label:<38} {result['seconds']:>7.3f}s  {result['books']:>6} livros  {result['requests']:>5} req  "
+            f"{result['bytes'] / 1024:>9.1f} KiB  304={result['not_modified']} iguais={result['unchanged']} processadas={result['parsed']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark do motor de scraping: compara o tempo total do BookScraper assíncrono (concorrência por página)
+com o motor anterior (ThreadPoolExecutor por categoria, páginas de cada categoria baixadas em sequência),
+ambos contra a réplica local do site. A extração de HTML é a mesma nos dois casos.
+
+Uso: python -m benchmarks.scraper_engine --latency 0.05 --books 1000
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.makedirs("logs", exist_ok=True)
+
+import requests  # noqa: E402
+from bs4 import BeautifulSoup  # noqa: E402
+from api.scrapper.bookScraper import BookScraper  # noqa: E402
+from benchmarks.replica import ReplicaServer, default_category_sizes  # noqa: E402
+
+
+def scrape_threaded(base_url: str, max_workers: int = 10):
+    """
+    Reprodução do motor anterior: uma thread por categoria (máx. 10) e paginação sequencial via li.next.
+    """
+    scraper = BookScraper(base_url=base_url)
+    session = requests.Session()
+    soup = BeautifulSoup(session.get(scraper.base_url, timeout=10).text, "lxml")
+    categories = {link.text.strip(): scraper.base_url + link["href"] for link in soup.select("div.side_categories ul.nav-list li ul li a")}
+
+    def scrape_category(name, url):
+        books, page = [], 1
+        while True:
+            page_url = url if page == 1 else url.replace("index.html", f"page-{page}.html")
+            response = session.get(page_url, timeout=10)
+            if response.status_code != 200:
+                break
+            page_books, page_count = scraper.parse_category_page(response.text, name, page)
+            books.extend(page_books)
+            if page >= page_count:
+                break
+            page += 1
+        return books
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(lambda item: scrape_category(*item), categories.items())
+        return [book for books in results for book in books]
+
+
+def scrape_async(base_url: str, max_concurrency: int):
+    return BookScraper(base_url=base_url, max_concurrency=max_concurrency).scrape_all()
+
+
+def measure(label: str, func, *args):
+    start = time.perf_counter()
+    books = func(*args)
+    elapsed = time.perf_counter() - start
+    return {"engine": label, "seconds": round(elapsed, 3), "books": len(books)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do motor de scraping contra a réplica local")
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--books", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.05, help="Latência por requisição na réplica, em segundos")
+    parser.add_argument("--concurrency", type=int, default=BookScraper.MAX_CONCURRENCY)
+    parser.add_argument("--output", help="Arquivo JSON para salvar os resultados")
+    args = parser.parse_args()
+
+    with ReplicaServer(default_category_sizes(args.categories, args.books), args.latency) as replica:
+        results = [
+            measure("threaded (10 categorias, páginas sequenciais)", scrape_threaded, replica.base_url),
+            measure(f"async (concorrência {args.concurrency} por página)", scrape_async, replica.base_url, args.concurrency),
+        ]
+
+    baseline = results[0]["seconds"]
+    for result in results:
+        result["speedup"] = round(baseline / result["seconds"], 2) if result["seconds"] else None
+        print(f"{result['engine']:<50} {result['seconds']:>8.3f}s  {result['books']:>6} livros  {result['speedup']}x")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"params": vars(args), "results": results}, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Harness de benchmark do scraper offline: executa BookScraper.scrape_all contra a réplica local
+(benchmarks/replica.py) com tamanho do site, paginação, latência e taxa de erros configuráveis, e reporta
+páginas/s, livros/s e a divisão do tempo entre CPU de extração (parse do HTML), demais CPU do event loop
+(HTTP, hashing, montagem dos resultados) e espera de rede.
+
+A CPU é medida com time.thread_time na thread que executa o event loop do scraper. Por padrão a réplica
+roda em outro processo, para que as threads do servidor não disputem o GIL com o scraper (--in-process
+mantém tudo no mesmo processo).
+
+Uso: python -m benchmarks.scraper_harness --books 2000 --latency 0.05 --jitter 0.02 --error-rate 0.01 --runs 3
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+os.makedirs("logs", exist_ok=True)
+
+import httpx  # noqa: E402
+
+from api.metrics import SCRAPER_RETRIES  # noqa: E402
+from api.scrapper.bookScraper import BookScraper  # noqa: E402
+from benchmarks.replica import PAGE_SIZE, ReplicaServer, default_category_sizes  # noqa: E402
+
+
+class TimedScraper(BookScraper):
+    """
+    BookScraper instrumentado: conta páginas pedidas (cada uma pode ter novas tentativas), bytes e respostas
+    de erro finais e acumula a CPU gasta na extração.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.requests = 0
+        self.error_responses = 0
+        self.bytes_received = 0
+        self.pages_parsed = 0
+        self.parse_cpu = 0.0
+
+    async def _fetch(self, client, url, headers=None):
+        response = await super()._fetch(client, url, headers)
+        self.requests += 1
+        self.bytes_received += len(response.content)
+        if response.status_code >= 400:
+            self.error_responses += 1
+        return response
+
+    def parse_category_page(self, html, category_name, page):
+        start = time.thread_time()
+        try:
+            return super().parse_category_page(html, category_name, page)
+        finally:
+            self.parse_cpu += time.thread_time() - start
+            self.pages_parsed += 1
+
+
+def total_retries() -> int:
+    return int(sum(value for _, _, _, value in SCRAPER_RETRIES.samples()))
+
+
+def run_once(base_url: str, concurrency: int) -> dict:
+    scraper = TimedScraper(base_url=base_url, max_concurrency=concurrency)
+    retries_before = total_retries()
+    wall_start, cpu_start = time.perf_counter(), time.thread_time()
+    books = scraper.scrape_all()
+    wall, cpu = time.perf_counter() - wall_start, time.thread_time() - cpu_start
+    return {
+        "seconds": round(wall, 3),
+        "books": len(books),
+        "requests": scraper.requests,
+        "pages_parsed": scraper.pages_parsed,
+        "error_responses": scraper.error_responses,
+        "retries": total_retries() - retries_before,
+        "failed_pages": len(scraper.failed_pages),
+        "bytes": scraper.bytes_received,
+        "pages_per_s": round(scraper.requests / wall, 1),
+        "books_per_s": round(len(books) / wall, 1),
+        "cpu_parse_s": round(scraper.parse_cpu, 3),
+        "cpu_other_s": round(cpu - scraper.parse_cpu, 3),
+        "network_wait_s": round(max(wall - cpu, 0.0), 3),
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_replica_process(args) -> tuple:
+    """
+    Inicia a réplica em um processo separado e aguarda a página inicial responder.
+    """
+    port = free_port()
+    command = [
+        sys.executable, "-m", "benchmarks.replica",
+        "--port", str(port),
+        "--categories", str(args.categories),
+        "--books", str(args.books),
+        "--latency", str(args.latency),
+        "--jitter", str(args.jitter),
+        "--error-rate", str(args.error_rate),
+        "--page-size", str(args.page_size),
+        "--seed", str(args.seed),
+    ]  # fmt: skip
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}/"
+    deadline = time.perf_counter() + 60
+    while time.perf_counter() < deadline:
+        try:
+            httpx.get(base_url, timeout=1)
+            return process, base_url
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("A réplica não ficou pronta a tempo")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Harness de benchmark do scraper contra a réplica local")
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--books", type=int, default=1000)
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE, help="Livros por página de categoria")
+    parser.add_argument("--latency", type=float, default=0.05, help="Latência por requisição na réplica, em segundos")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Variação aleatória somada à latência, em segundos")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração das páginas de categoria respondidas com 503")
+    parser.add_argument("--concurrency", type=int, default=BookScraper.MAX_CONCURRENCY)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--in-process", action="store_true", help="Executa a réplica em uma thread deste processo")
+    parser.add_argument("--output", help="Arquivo JSON para salvar os resultados")
+    args = parser.parse_args()
+
+    sizes = default_category_sizes(args.categories, args.books)
+    if args.in_process:
+        replica = ReplicaServer(sizes, args.latency, jitter=args.jitter, error_rate=args.error_rate, page_size=args.page_size, seed=args.seed).start()
+        base_url, stop = replica.base_url, replica.stop
+    else:
+        process, base_url = start_replica_process(args)
+        stop = process.terminate
+
+    try:
+        runs = [run_once(base_url, args.concurrency) for _ in range(args.runs)]
+    finally:
+        stop()
+
+    print(f"Site: {args.books} livros em {args.categories} categorias, {args.page_size} por página")
+    print(
+        f"{'exec':>4} {'tempo':>8} {'páginas/s':>10} {'livros/s':>10} {'livros':>7} {'retries':>8} {'falhas':>7} "
+        f"{'parse':>8} {'cpu outros':>11} {'rede':>8}"
+    )
+    for number, run in enumerate(runs, 1):
+        print(
+            f"{number:>4} {run['seconds']:>7.3f}s {run['pages_per_s']:>10.1f} {run['books_per_s']:>10.1f} {run['books']:>7} "
+            f"{run['retries']:>8} {run['failed_pages']:>7} {run['cpu_parse_s']:>7.3f}s {run['cpu_other_s']:>10.3f}s {run['network_wait_s']:>7.3f}s"
+        )
+    summary = {key: round(statistics.median(run[key] for run in runs), 3) for key in runs[0]}
+    print(f"{'med.':>4} {summary['seconds']:>7.3f}s {summary['pages_per_s']:>10.1f} {summary['books_per_s']:>10.1f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"params": vars(args), "runs": runs, "median": summary}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
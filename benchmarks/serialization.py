@@ -0,0 +1,110 @@
+"""
+Benchmark da serialização das rotas de listagem: compara o caminho anterior (to_dict + validação
+pydantic por linha + encoder JSON padrão) com o caminho atual (payloads pré-computados + orjson),
+medindo respostas por segundo e bytes trafegados sem compressão, com gzip e com brotli.
+
+O cache de respostas é limpo antes de cada requisição, para medir a serialização e não o cache.
+Como o catálogo é o CSV original repetido, a taxa de compressão (sobretudo do brotli) fica acima da real.
+
+Uso: python -m benchmarks.serialization --scale 10 --repeat 20
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+os.makedirs("logs", exist_ok=True)
+
+import pandas as pd  # noqa: E402
+
+ENDPOINTS = ["/api/v1/books", "/api/v1/books/top-rated", "/api/v1/ml/training-data"]
+
+
+def build_catalog(scale: int, path: str):
+    """
+    Gera um catálogo com o CSV original repetido scale vezes (ids únicos).
+    """
+    df = pd.read_csv("data/books.csv")
+    frames = []
+    for copy in range(scale):
+        frame = df.copy()
+        frame["id"] = frame["id"] + copy * 10**8
+        frames.append(frame)
+    pd.concat(frames, ignore_index=True).to_csv(path, index=False)
+
+
+def legacy_render(df: pd.DataFrame, rows) -> bytes:
+    """
+    Reproduz o caminho anterior: to_dict("records"), validação List[Book] e encoder JSON padrão do FastAPI.
+    """
+    from fastapi.encoders import jsonable_encoder
+    from pydantic import TypeAdapter
+    from typing import List
+    from api.models import Book
+
+    records = rows.to_dict("records")
+    validated = TypeAdapter(List[Book]).validate_python(records)
+    return json.dumps(jsonable_encoder(validated), ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def rate(func, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    elapsed = time.perf_counter() - start
+    return repeat / elapsed, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de serialização das rotas de listagem")
+    parser.add_argument("--scale", type=int, default=10, help="Multiplicador do catálogo original (1000 livros)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="Arquivo JSON para salvar os resultados")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, "books.csv")
+        build_catalog(args.scale, data_file)
+        os.environ["DATA_FILE"] = data_file
+
+        from fastapi.testclient import TestClient
+        from api.main import app
+        from api.dependencies import get_dataset
+        from api.http_cache import response_cache
+
+        client = TestClient(app)
+        df = get_dataset().df
+        legacy_rows = {
+            "/api/v1/books": df,
+            "/api/v1/books/top-rated": df[df["rating"] == 5],
+            "/api/v1/ml/training-data": df,
+        }
+
+        results = []
+        for endpoint in ENDPOINTS:
+            per_second, body = rate(lambda: legacy_render(df, legacy_rows[endpoint]), args.repeat)
+            results.append({"endpoint": endpoint, "path": "legacy", "encoding": "identity", "req_per_s": round(per_second, 1), "bytes": len(body)})
+
+            for encoding in ("identity", "gzip", "br"):
+
+                def request():
+                    response_cache._entries.clear()
+                    response = client.get(endpoint, headers={"Accept-Encoding": encoding})
+                    return int(response.headers.get("content-length", len(response.content)))
+
+                per_second, size = rate(request, args.repeat)
+                results.append({"endpoint": endpoint, "path": "fast", "encoding": encoding, "req_per_s": round(per_second, 1), "bytes": size})
+
+    print(f"Catálogo: {1000 * args.scale} livros")
+    for result in results:
+        print(f"{result['endpoint']:<28} {result['path']:<7} {result['encoding']:<9} {result['req_per_s']:>9.1f} req/s {result['bytes'] / 1024:>10.1f} KiB")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"params": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
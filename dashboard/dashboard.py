@@ -2,59 +2,97 @@ import streamlit as st
 import pandas as pd
 import requests
 import plotly.express as px
-import time
+import threading
 import os
 
 # Obtém o hostname da API do ambiente
 API_HOST = os.getenv("API_HOST", "http://localhost:8000")  # Fallback para localhost
 
+# Intervalo, em segundos, entre as verificações de alteração do dataset
+REFRESH_INTERVAL = int(os.getenv("DASHBOARD_REFRESH_INTERVAL", "30"))
+
+# Quantidade de livros no ranking por preço
+TOP_N = 5
+
 st.title("Books Scraper Dashboard")
 st.subheader("Press R for content refresh")
 
 
-# Função para carregar os dados com cache e atualização periódica
-@st.cache_data(ttl=30)  # Recarrega a cada 60 segundos
-def load_data(_timestamp):
+class AggregatesCache:
+    """
+    Último resumo recebido da API e o ETag correspondente, compartilhado entre as sessões do dashboard.
+    A cada verificação o resumo é revalidado com If-None-Match: enquanto o dataset não muda, a API
+    responde 304 sem corpo e o resumo em memória é reaproveitado.
+    """
+
+    def __init__(self):
+        self.etag = None
+        self.data = None
+        self._lock = threading.Lock()
+
+    def refresh(self) -> dict:
+        with self._lock:
+            headers = {"If-None-Match": self.etag} if self.etag else {}
+            response = requests.get(f"{API_HOST}/api/v1/stats/dashboard", params={"top": TOP_N}, headers=headers, timeout=5)
+            if response.status_code == 200:
+                self.data = response.json()
+                self.etag = response.headers.get("ETag")
+            elif response.status_code != 304:
+                response.raise_for_status()
+            return self.data
+
+
+@st.cache_resource
+def aggregates_cache() -> AggregatesCache:
+    return AggregatesCache()
+
+
+@st.cache_data(ttl=10, show_spinner=False)
+def load_health() -> dict:
+    """
+    Consulta o status da API, reaproveitando a resposta por 10 segundos.
+    """
+    response = requests.get(f"{API_HOST}/api/v1/health", timeout=5)
+    return response.json()
+
+
+@st.fragment(run_every=REFRESH_INTERVAL)
+def render_aggregates():
     """
-    Carrega os dados do CSV com cache de 60 segundos.
-    O parâmetro _timestamp força a recarga periódica.
+    Desenha os indicadores a partir do resumo pré-calculado pela API; o custo não depende do tamanho do catálogo.
     """
     try:
-        df = pd.read_csv(
-            "data/books.csv",
-            dtype={"id": int, "title": str, "href": str, "price": float, "rating": int, "availability": str, "category": str, "image_url": str},
-        )
-        return df
+        data = aggregates_cache().refresh()
     except Exception as e:
-        st.error(f"Erro ao carregar o CSV: {str(e)}")
-        return pd.DataFrame()
+        st.error(f"Erro ao carregar os dados da API: {str(e)}")
+        return
 
+    # Total de livros
+    st.metric("Total de Livros", data["total_books"])
 
-# Força a recarga periódica usando o timestamp atual
-df = load_data(time.time())
+    # Preço médio
+    st.metric("Preço Médio", f"£{data['average_price']:.2f}")
 
-# Total de livros
-st.metric("Total de Livros", len(df))
+    # Distribuição de ratings
+    ratings = data["rating_counts"]
+    fig = px.bar(x=list(ratings.keys()), y=list(ratings.values()), labels={"x": "rating", "y": "count"}, title="Distribuição de Ratings")
+    st.plotly_chart(fig)
 
-# Preço médio
-st.metric("Preço Médio", f"£{df['price'].mean():.2f}" if not df.empty else "£0.00")
+    # Livros por categoria
+    categories = data["category_counts"]
+    fig = px.bar(x=list(categories.keys()), y=list(categories.values()), labels={"x": "category", "y": "count"}, title="Livros por Categoria")
+    st.plotly_chart(fig)
 
-# Distribuição de ratings
-fig = px.histogram(df, x="rating", title="Distribuição de Ratings")
-st.plotly_chart(fig)
+    # Top 5 livros mais caros
+    st.subheader("Top 5 Livros Mais Caros")
+    st.dataframe(pd.DataFrame(data["top_by_price"], columns=["title", "price", "category"]))
 
-# Livros por categoria
-fig = px.histogram(df, x="category", title="Livros por Categoria")
-st.plotly_chart(fig)
 
-# Top 5 livros mais caros
-st.subheader("Top 5 Livros Mais Caros")
-st.dataframe(df.nlargest(5, "price")[["title", "price", "category"]] if not df.empty else pd.DataFrame())
+render_aggregates()
 
 # Consulta à API para status
 try:
-    response = requests.get(f"{API_HOST}/api/v1/health", timeout=5)
-    health = response.json()
+    health = load_health()
     st.metric("API Status", health["api_status"])
     st.metric("Dados Carregados", str(health["data_loaded"]))
 except Exception as e: